@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Regenerate slopat/graph/core_ontology.nt from core_ontology.ttl"""
+
+from pathlib import Path
+
+import pyoxigraph as ox
+
+GRAPH_DIR = Path(__file__).resolve().parent.parent / "slopat" / "graph"
+
+def main():
+    """Parse the Turtle source and write it back out as sorted N-Triples"""
+    source = GRAPH_DIR / "core_ontology.ttl"
+    target = GRAPH_DIR / "core_ontology.nt"
+
+    triples = ox.parse(path=source, format=ox.RdfFormat.TURTLE)
+    lines = sorted(f"{triple} .\n" for triple in triples)
+    target.write_text("".join(lines), encoding="utf-8")
+
+    print(f"Wrote {len(lines)} triples to {target}")
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,158 @@
 """Oxigraph wrapper for slop.at semantic storage"""
 
-from typing import List, Dict, Optional, Iterator, Tuple
+from __future__ import annotations
+
+from typing import List, Dict, Optional, Iterator, Iterable, Tuple, Callable, Union, BinaryIO
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from importlib import resources
 import logging
+import sys
+from time import monotonic, perf_counter_ns
 from dataclasses import dataclass
 
-try:
-    import pyoxigraph as ox
-except ImportError:
-    print("Pyoxigraph not installed. Install with: pip install pyoxigraph")
-    ox = None
+# pyoxigraph is imported by _load_ox() when the first SlopStore is created,
+# so importing slopat doesn't pay for loading the Rust extension
+ox = None
+
+from ..parsers.ontology_mapper import SemanticMapping, RDFTriple, LITERAL_ESCAPES
+
+# Pre-generated from core_ontology.ttl by scripts/build_core_ontology.py
+CORE_ONTOLOGY_FILE = "core_ontology.nt"
+
+# Written inside the oxigraph directory once the core ontology is in the store, so
+# deleting or recreating that directory also drops the marker
+ONTOLOGY_MARKER = ".ontology_loaded"
+
+# Mappings smaller than this are inserted triple-by-triple; larger ones are
+# serialized to N-Quads and handed to oxigraph's bulk loader in one call
+BULK_LOAD_THRESHOLD = 64
+
+# Cached stats are also dropped after this many seconds, so writes made by
+# another process (the CLI or MCP server next to a read-only web app) show up
+STATS_CACHE_TTL = 5.0
+
+# Shared NamedNodes for the XSD datatypes the ontology mapper emits (filled by _load_ox)
+XSD = "http://www.w3.org/2001/XMLSchema#"
+XSD_DATATYPE_URIS = tuple(f"{XSD}{name}" for name in ("float", "integer", "boolean", "string", "dateTime"))
+_XSD_DATATYPES: Dict[str, object] = {}
+
+SPARQL_PREFIXES = """
+PREFIX slop: <http://slop.at/ontology#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX dct: <http://purl.org/dc/terms/>
+"""
+
+# Query templates are built once; ?label is bound through substitutions and
+# __LIMIT__ is filled in per call. pyoxigraph only substitutes projected variables.
+STATS_FIELDS = ("total_documents", "total_concepts", "conversations", "markdown_docs")
+
+# All four counts come back as one row from a single query
+STATS_QUERY = """
+SELECT ?total_documents ?total_concepts ?conversations ?markdown_docs WHERE {
+    { SELECT (COUNT(DISTINCT ?doc) as ?total_documents) WHERE { ?doc a slop:Document } }
+    { SELECT (COUNT(DISTINCT ?concept) as ?total_concepts) WHERE { ?concept a slop:Concept } }
+    { SELECT (COUNT(?doc) as ?conversations) WHERE { ?doc a slop:ConversationDocument } }
+    { SELECT (COUNT(?doc) as ?markdown_docs) WHERE { ?doc a slop:MarkdownDocument } }
+}
+"""
+
+RELATED_DOCUMENTS_QUERY = """
+SELECT DISTINCT ?label ?doc ?title ?confidence ?domain WHERE {
+    ?concept a slop:Concept ;
+        rdfs:label ?label .
+    ?doc a slop:Document ;
+        slop:discusses ?concept ;
+        slop:typeConfidence ?confidence .
+    OPTIONAL { ?doc dct:title ?title }
+    OPTIONAL { ?doc slop:primaryDomain ?domain }
+}
+ORDER BY DESC(?confidence)
+LIMIT __LIMIT__
+"""
+
+CO_OCCURRING_CONCEPTS_QUERY = """
+SELECT ?label ?related_concept (COUNT(?doc) as ?frequency) WHERE {
+    ?concept rdfs:label ?label .
+    ?concept slop:coOccursWith ?related .
+    ?related rdfs:label ?related_concept .
+    ?doc slop:discusses ?concept .
+    ?doc slop:discusses ?related .
+}
+GROUP BY ?label ?related_concept
+ORDER BY DESC(?frequency)
+LIMIT __LIMIT__
+"""
+
+def _load_ox():
+    """Import pyoxigraph on first use and cache it as the module global ox"""
+    global ox
+    if ox is None:
+        try:
+            import pyoxigraph
+        except ImportError:
+            raise ImportError(
+                "Pyoxigraph is required for semantic storage. Install with: pip install pyoxigraph"
+            ) from None
+        _XSD_DATATYPES.update({uri: pyoxigraph.NamedNode(uri) for uri in XSD_DATATYPE_URIS})
+        ox = pyoxigraph
+    return ox
+
+def _uri_expander(namespaces: Dict[str, str]) -> Callable[[str], str]:
+    """Build a prefixed-URI expander bound to one mapping's namespaces"""
+    def expand(uri: str) -> str:
+        prefix, sep, local_name = uri.partition(":")
+        if sep and prefix in namespaces and not uri.startswith(("http://", "https://")):
+            return namespaces[prefix] + local_name
+        return uri
+    return expand
 
-from ..parsers.ontology_mapper import SemanticMapping, RDFTriple
+def _term_value(term) -> str:
+    """Lexical value of a NamedNode or Literal"""
+    return term.value
 
-@dataclass
+@dataclass(slots=True)
 class QueryResult:
-    """Results from SPARQL queries"""
-    bindings: List[Dict[str, str]]
+    """Results from SPARQL queries, stored column-wise"""
+    variables: Tuple[str, ...]
+    columns: Dict[str, List[Optional[str]]]
     total_results: int
     query_time_ms: Optional[float] = None
 
+    def rows(self) -> Iterator[Dict[str, str]]:
+        """Yield one dict per solution, omitting unbound variables"""
+        columns = [(name, self.columns[name]) for name in self.variables]
+        for i in range(self.total_results):
+            yield {name: column[i] for name, column in columns if column[i] is not None}
+
+    @property
+    def bindings(self) -> List[Dict[str, str]]:
+        """Row-wise view of the results"""
+        return list(self.rows())
+
 class SlopStore:
     """
     Oxigraph-based storage for slop.at semantic data.
     Inspired by CodeDoc's graph storage patterns.
     """
+
+    # Prefixed query text, shared by all instances
+    _prepared: Dict[str, str] = {
+        "stats": SPARQL_PREFIXES + STATS_QUERY,
+        "related_documents": SPARQL_PREFIXES + RELATED_DOCUMENTS_QUERY,
+        "co_occurring_concepts": SPARQL_PREFIXES + CO_OCCURRING_CONCEPTS_QUERY,
+    }
     
-    def __init__(self, data_dir: Path = None, read_only: bool = False):
+    def __init__(self, data_dir: Path = None, read_only: bool = False, background_writes: bool = False):
         """Initialize Oxigraph store
 
         Args:
             data_dir: Directory for storing RDF data
             read_only: If True, open store in read-only mode (won't acquire lock)
+            background_writes: If True, store_semantic_mapping_async loads on a worker thread
         """
-        if ox is None:
-            raise ImportError("Pyoxigraph is required for semantic storage")
+        _load_ox()
 
         # Default data directory
         if data_dir is None:
@@ -46,6 +164,7 @@ class SlopStore:
 
         # Initialize Oxigraph store
         store_path = self.data_dir / "oxigraph"
+        self._ontology_marker = store_path / ONTOLOGY_MARKER
         if read_only:
             # Open in read-only mode using Store.read_only
             self.store = ox.Store.read_only(str(store_path))
@@ -55,105 +174,53 @@ class SlopStore:
         # Setup logging
         self.logger = logging.getLogger(__name__)
 
+        # Serialized writes waiting for the end of a batch() block, one entry per mapping,
+        # and the mappings whose writes failed when the block was flushed
+        self._batch_buffer: Optional[List[Tuple[SemanticMapping, bytes]]] = None
+        self._batch_failed: List[SemanticMapping] = []
+        self._batch_flush_every: Optional[int] = None
+
+        # Bumped on every write; cached stats are only valid for the version they were
+        # computed at, and only for STATS_CACHE_TTL seconds
+        self._write_version = 0
+        self._stats_cache: Optional[Tuple[int, float, Dict[str, int]]] = None
+
+        # Single ingest worker; pyoxigraph releases the GIL while loading
+        self._ingest_pool = ThreadPoolExecutor(max_workers=1) if background_writes else None
+        self._pending_writes: List[Future] = []
+
         # Initialize core ontologies if store is empty (only in read-write mode)
         if not read_only:
             self._initialize_core_ontologies()
     
     def _initialize_core_ontologies(self):
         """Load core slop.at ontologies if not already present"""
+        # Marker present: ontology already loaded, skip the full-store count
+        marker = self._ontology_marker
+        if marker.exists():
+            return
+        
         # Check if we have any data
         count_query = "SELECT (COUNT(*) as ?count) WHERE { ?s ?p ?o }"
-        result = self.query_sparql(count_query)
-        
-        if result.bindings and int(result.bindings[0].get('count', 0)) == 0:
+        count = self._scalar_query(count_query)
+        if count == 0:
             self.logger.info("Initializing core ontologies...")
             self._load_core_ontology()
+        elif count:
+            # Store predates the marker file
+            marker.touch()
     
     def _load_core_ontology(self):
         """Load the core slop.at ontology definitions"""
-        core_ontology = """
-@prefix slop: <http://slop.at/ontology#> .
-@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
-@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
-@prefix owl: <http://www.w3.org/2002/07/owl#> .
-
-# Core Classes
-slop:Document a owl:Class ;
-    rdfs:label "Document" ;
-    rdfs:comment "A document or conversation in slop.at" .
-
-slop:ConversationDocument a owl:Class ;
-    rdfs:subClassOf slop:Document ;
-    rdfs:label "Conversation Document" .
-
-slop:MarkdownDocument a owl:Class ;
-    rdfs:subClassOf slop:Document ;
-    rdfs:label "Markdown Document" .
-
-slop:PlainTextDocument a owl:Class ;
-    rdfs:subClassOf slop:Document ;
-    rdfs:label "Plain Text Document" .
-
-slop:StructuredDocument a owl:Class ;
-    rdfs:subClassOf slop:Document ;
-    rdfs:label "Structured Document" .
-
-slop:Concept a owl:Class ;
-    rdfs:label "Concept" ;
-    rdfs:comment "A concept extracted from a document" .
-
-# Core Properties
-slop:discusses a owl:ObjectProperty ;
-    rdfs:domain slop:Document ;
-    rdfs:range slop:Concept ;
-    rdfs:label "discusses" .
-
-slop:coOccursWith a owl:ObjectProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range slop:Concept ;
-    rdfs:label "co-occurs with" .
-
-slop:typeConfidence a owl:DatatypeProperty ;
-    rdfs:domain slop:Document ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#float> ;
-    rdfs:label "type confidence" .
-
-slop:confidence a owl:DatatypeProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#float> ;
-    rdfs:label "confidence" .
-
-slop:glinerLabel a owl:DatatypeProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#string> ;
-    rdfs:label "GLiNER label" .
-
-slop:context a owl:DatatypeProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#string> ;
-    rdfs:label "context" .
-
-slop:startPosition a owl:DatatypeProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#integer> ;
-    rdfs:label "start position" .
-
-slop:endPosition a owl:DatatypeProperty ;
-    rdfs:domain slop:Concept ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#integer> ;
-    rdfs:label "end position" .
-
-slop:primaryDomain a owl:DatatypeProperty ;
-    rdfs:domain slop:Document ;
-    rdfs:range <http://www.w3.org/2001/XMLSchema#string> ;
-    rdfs:label "primary domain" .
-"""
+        # Shipped pre-expanded as N-Triples (generated from core_ontology.ttl)
+        # so loading skips Turtle prefix resolution
+        core_ontology = resources.files(__package__).joinpath(CORE_ONTOLOGY_FILE).read_bytes()
         
-        # Load into store
-        self.store.load(
-            core_ontology.encode('utf-8'),
-            mime_type="text/turtle"
-        )
+        # bulk_load skips the per-transaction commit of load(). It gives up atomicity,
+        # which is fine here: the ontology is a fixed set of triples, so an
+        # interrupted load is repaired by simply loading it again
+        self.store.bulk_load(core_ontology, format=ox.RdfFormat.N_TRIPLES)
+        self._ontology_marker.touch()
         
         self.logger.info("Core ontology loaded successfully")
     
@@ -163,48 +230,225 @@ slop:primaryDomain a owl:DatatypeProperty ;
         Similar to CodeDoc's graph storage methods.
         """
         try:
-            # Convert triples to Oxigraph format
-            ox_triples = []
+            if self._batch_buffer is not None:
+                # Inside batch(): defer the write until the block exits
+                data, triple_count = self._serialize_mapping(mapping, graph_uri)
+                self._batch_buffer.append((mapping, data))
+                self.logger.info(f"Buffered {triple_count} triples from semantic mapping")
+                if self._batch_flush_every and len(self._batch_buffer) >= self._batch_flush_every:
+                    buffered, self._batch_buffer = self._batch_buffer, []
+                    self._flush_batch(buffered, self._batch_failed)
+                return True
+
+            if len(mapping.triples) >= BULK_LOAD_THRESHOLD:
+                # Large mappings: one serialized buffer, one call into Rust
+                data, triple_count = self._serialize_mapping(mapping, graph_uri)
+                self.store.bulk_load(data, ox.RdfFormat.N_QUADS)
+                self._write_version += 1
+                self.logger.info(f"Bulk loaded {triple_count} triples from semantic mapping")
+                return True
+
+            # Convert triples straight to quads (Store.extend only accepts quads)
+            expand = _uri_expander(mapping.namespaces)
+            convert = self._convert_to_oxigraph_triple
+            Quad = ox.Quad
+            graph = ox.NamedNode(graph_uri) if graph_uri else ox.DefaultGraph()
+            # The triple count is known up front, so fill a presized list and trim the skipped ones
+            quads = [None] * len(mapping.triples)
+            stored = 0
             for triple in mapping.triples:
-                ox_triple = self._convert_to_oxigraph_triple(triple, mapping.namespaces)
+                ox_triple = convert(triple, expand)
                 if ox_triple:
-                    ox_triples.append(ox_triple)
+                    quads[stored] = Quad(ox_triple.subject, ox_triple.predicate, ox_triple.object, graph)
+                    stored += 1
+            del quads[stored:]
             
             # Insert triples
-            if graph_uri:
-                graph = ox.NamedNode(graph_uri)
-                quads = [ox.Quad(t.subject, t.predicate, t.object, graph) for t in ox_triples]
-                self.store.extend(quads)
-            else:
-                self.store.extend(ox_triples)
+            self.store.extend(quads)
+            self._write_version += 1
             
-            self.logger.info(f"Stored {len(ox_triples)} triples from semantic mapping")
+            self.logger.info(f"Stored {len(quads)} triples from semantic mapping")
             return True
             
         except Exception as e:
             self.logger.error(f"Error storing semantic mapping: {e}")
             return False
     
-    def _convert_to_oxigraph_triple(self, triple: RDFTriple, namespaces: Dict[str, str]) -> Optional[ox.Triple]:
+    def add_many_mappings(self, mappings: Iterable[SemanticMapping], graph_uri: Optional[str] = None) -> bool:
+        """
+        Store several semantic mappings with a single bulk load.
+        All mappings are serialized into one buffer before anything is written.
+        """
+        try:
+            with self.batch() as failed:
+                stored = [self.store_semantic_mapping(mapping, graph_uri) for mapping in mappings]
+        except Exception as e:
+            self.logger.error(f"Error storing semantic mappings: {e}")
+            return False
+        
+        return all(stored) and not failed
+
+    def store_semantic_mapping_async(self, mapping: SemanticMapping, graph_uri: Optional[str] = None) -> Future:
+        """
+        Store a semantic mapping without waiting for the write.
+        The mapping is serialized on the calling thread and bulk loaded on the
+        ingest worker. Without background_writes (or inside batch()) this
+        behaves like store_semantic_mapping and returns a completed future.
+        """
+        if self._ingest_pool is None or self._batch_buffer is not None:
+            future: Future = Future()
+            future.set_result(self.store_semantic_mapping(mapping, graph_uri))
+            return future
+
+        try:
+            data, triple_count = self._serialize_mapping(mapping, graph_uri)
+        except Exception as e:
+            self.logger.error(f"Error storing semantic mapping: {e}")
+            future = Future()
+            future.set_result(False)
+            return future
+
+        future = self._ingest_pool.submit(self._load_serialized, data, triple_count)
+        self._pending_writes = [f for f in self._pending_writes if not f.done()]
+        self._pending_writes.append(future)
+        return future
+
+    def _load_serialized(self, data: bytes, triple_count: int) -> bool:
+        """Bulk load a serialized mapping (runs on the ingest worker)"""
+        try:
+            self.store.bulk_load(data, ox.RdfFormat.N_QUADS)
+        except Exception as e:
+            self.logger.error(f"Error storing semantic mapping: {e}")
+            return False
+        
+        self._write_version += 1
+        self.logger.info(f"Bulk loaded {triple_count} triples from semantic mapping")
+        return True
+
+    def flush(self) -> bool:
+        """Wait for pending background writes; True if all of them succeeded"""
+        pending, self._pending_writes = self._pending_writes, []
+        return all([future.result() for future in pending])
+
+    @property
+    def in_batch(self) -> bool:
+        """Whether store_semantic_mapping is currently buffering inside batch()"""
+        return self._batch_buffer is not None
+
+    @contextmanager
+    def batch(self, flush_every: Optional[int] = None) -> Iterator[List[SemanticMapping]]:
+        """
+        Buffer store_semantic_mapping writes and flush them with one bulk load.
+        With flush_every, the buffer is also flushed whenever it holds that many mappings,
+        bounding its memory and what an exception can discard.
+        Inside the block those calls report True once a mapping is buffered; the yielded
+        list collects the mappings that failed to load, complete once the block exits.
+        Nested batch() blocks join the outermost one; an exception discards the buffer.
+        """
+        if self._batch_buffer is not None:
+            yield self._batch_failed
+            return
+
+        self._batch_buffer = []
+        self._batch_failed = failed = []
+        self._batch_flush_every = flush_every
+        try:
+            yield failed
+            buffered = self._batch_buffer
+        finally:
+            self._batch_buffer = None
+            self._batch_flush_every = None
+
+        if buffered:
+            self._flush_batch(buffered, failed)
+
+    def _flush_batch(self, buffered: List[Tuple[SemanticMapping, bytes]], failed: List[SemanticMapping]):
+        """Bulk load buffered mappings, retrying one by one if the combined load fails"""
+        try:
+            self.store.bulk_load(b"".join(data for _, data in buffered), ox.RdfFormat.N_QUADS)
+        except Exception as e:
+            # bulk_load isn't atomic, so part of the batch may already be in; reloading is harmless
+            self.logger.error(f"Error flushing batch, loading mappings individually: {e}")
+            for mapping, data in buffered:
+                try:
+                    self.store.bulk_load(data, ox.RdfFormat.N_QUADS)
+                except Exception as e:
+                    self.logger.error(f"Error storing semantic mapping: {e}")
+                    failed.append(mapping)
+        finally:
+            self._write_version += 1
+
+        self.logger.info(f"Flushed batch of {len(buffered) - len(failed)}/{len(buffered)} mappings to graph store")
+
+    def _serialize_mapping(self, mapping: SemanticMapping, graph_uri: Optional[str] = None) -> Tuple[bytes, int]:
+        """
+        Serialize a semantic mapping to an N-Quads buffer for bulk loading.
+        Triples with terms oxigraph would reject are skipped, as in _convert_to_oxigraph_triple,
+        so one bad term can't fail the whole load.
+        """
+        NamedNode = ox.NamedNode
+        graph = f" {NamedNode(graph_uri)}" if graph_uri else ""
+        expand = _uri_expander(mapping.namespaces)
+        iris: Dict[str, str] = {}  # prefixed/full URI -> <expanded IRI>
+
+        def iri(uri: str) -> str:
+            term = iris.get(uri)
+            if term is None:
+                # NamedNode validates the IRI and renders it in N-Triples form
+                term = iris[uri] = str(NamedNode(expand(uri)))
+            return term
+
+        escapes = LITERAL_ESCAPES
+        lines = []
+        append = lines.append
+        for triple in mapping.triples:
+            try:
+                if triple.object_type == "uri":
+                    obj = iri(triple.object)
+                elif triple.object_type == "literal":
+                    obj = f'"{triple.object.translate(escapes)}"'
+                elif triple.object_type == "typed_literal":
+                    obj = f'"{triple.object.translate(escapes)}"^^{iri(triple.datatype)}'
+                else:
+                    self.logger.warning(f"Unknown object type: {triple.object_type}")
+                    continue
+                append(f"{iri(triple.subject)} {iri(triple.predicate)} {obj}{graph} .\n")
+            except Exception as e:
+                self.logger.error(f"Error converting triple: {e}")
+
+        try:
+            data = "".join(lines).encode('utf-8')
+        except UnicodeEncodeError:
+            # Rare (lone surrogates in a literal): drop just the lines that can't be encoded
+            encoded = []
+            for line in lines:
+                try:
+                    encoded.append(line.encode('utf-8'))
+                except UnicodeEncodeError as e:
+                    self.logger.error(f"Error converting triple: {e}")
+            return b"".join(encoded), len(encoded)
+
+        return data, len(lines)
+
+    def _convert_to_oxigraph_triple(self, triple: RDFTriple, expand: Callable[[str], str]) -> Optional[ox.Triple]:
         """Convert our RDF triple format to Oxigraph triple"""
+        NamedNode, Literal = ox.NamedNode, ox.Literal
         try:
             # Subject (always URI)
-            subject = self._expand_uri(triple.subject, namespaces)
-            ox_subject = ox.NamedNode(subject)
+            ox_subject = NamedNode(expand(triple.subject))
             
             # Predicate (always URI)
-            predicate = self._expand_uri(triple.predicate, namespaces)
-            ox_predicate = ox.NamedNode(predicate)
+            ox_predicate = NamedNode(expand(triple.predicate))
             
             # Object (URI, literal, or typed literal)
-            if triple.object_type == "uri":
-                object_uri = self._expand_uri(triple.object, namespaces)
-                ox_object = ox.NamedNode(object_uri)
-            elif triple.object_type == "literal":
-                ox_object = ox.Literal(triple.object)
-            elif triple.object_type == "typed_literal":
-                datatype_uri = self._expand_uri(triple.datatype, namespaces)
-                ox_object = ox.Literal(triple.object, datatype=ox.NamedNode(datatype_uri))
+            object_type = triple.object_type
+            if object_type == "uri":
+                ox_object = NamedNode(expand(triple.object))
+            elif object_type == "literal":
+                ox_object = Literal(triple.object)
+            elif object_type == "typed_literal":
+                datatype = _XSD_DATATYPES.get(triple.datatype) or NamedNode(expand(triple.datatype))
+                ox_object = Literal(triple.object, datatype=datatype)
             else:
                 self.logger.warning(f"Unknown object type: {triple.object_type}")
                 return None
@@ -215,153 +459,167 @@ slop:primaryDomain a owl:DatatypeProperty ;
             self.logger.error(f"Error converting triple: {e}")
             return None
     
-    def _expand_uri(self, uri: str, namespaces: Dict[str, str]) -> str:
-        """Expand prefixed URI to full URI"""
-        if ":" in uri and not uri.startswith("http"):
-            prefix, local_name = uri.split(":", 1)
-            if prefix in namespaces:
-                return namespaces[prefix] + local_name
-        return uri
-    
-    def query_sparql(self, query: str, timeout_seconds: int = 30) -> QueryResult:
+    def query_sparql(self, query: str, timeout_seconds: int = 30,
+                     substitutions: Optional[Dict[str, object]] = None) -> QueryResult:
         """
         Execute SPARQL query and return results.
         Main query interface similar to CodeDoc's query methods.
+        
+        substitutions maps variable names to terms bound before evaluation;
+        those variables are left out of the result.
         """
         try:
-            import time
-            start_time = time.time()
+            start_ns = perf_counter_ns()
             
             # Execute query
-            results = self.store.query(query)
-            
-            query_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+            if substitutions:
+                results = self.store.query(query, substitutions={
+                    ox.Variable(name): term for name, term in substitutions.items()
+                })
+            else:
+                results = self.store.query(query)
             
             # Convert results to our format
-            bindings = []
+            # QuerySolution iterates over values in the order of results.variables;
+            # names are interned so every row dict built by rows() shares the same key objects
+            variables = tuple(sys.intern(variable.value) for variable in results.variables)
+            columns: Dict[str, List[Optional[str]]] = {name: [] for name in variables}
+            appends = [columns[name].append for name in variables]
+            term_value = _term_value
+            decode = {ox.NamedNode: term_value, ox.Literal: term_value}.get
+
+            total_results = 0
             for solution in results:
-                binding = {}
-                # pyoxigraph QuerySolution is a dict-like object
-                # Iterate through keys (variable names)
-                if hasattr(solution, '__iter__'):
-                    # Try iterating as a mapping
-                    try:
-                        for var_name in solution:
-                            value = solution[var_name]
-                            if value is not None:
-                                if isinstance(value, ox.NamedNode):
-                                    binding[var_name] = str(value.value)
-                                elif isinstance(value, ox.Literal):
-                                    binding[var_name] = str(value.value)
-                                else:
-                                    binding[var_name] = str(value)
-                    except Exception as e:
-                        self.logger.warning(f"Error iterating solution: {e}")
-                        continue
-                bindings.append(binding)
+                for append, value in zip(appends, solution):
+                    if value is None:
+                        append(None)
+                    else:
+                        decoder = decode(type(value))
+                        append(decoder(value) if decoder is not None else str(value))
+                total_results += 1
+            
+            # Solutions are evaluated lazily, so time through the loop
+            query_time = (perf_counter_ns() - start_ns) / 1_000_000  # Convert to milliseconds
+            
+            if substitutions:
+                for name in substitutions:
+                    columns.pop(name, None)
+                variables = tuple(name for name in variables if name in columns)
             
             return QueryResult(
-                bindings=bindings,
-                total_results=len(bindings),
+                variables=variables,
+                columns=columns,
+                total_results=total_results,
                 query_time_ms=query_time
             )
             
         except Exception as e:
             self.logger.error(f"SPARQL query error: {e}")
-            return QueryResult(bindings=[], total_results=0)
+            return QueryResult(variables=(), columns={}, total_results=0)
+    
+    def _scalar_query(self, query: str) -> Optional[int]:
+        """Return the first value of the first solution as an int, without building a QueryResult"""
+        try:
+            solution = next(iter(self.store.query(query)), None)
+        except Exception as e:
+            self.logger.error(f"SPARQL query error: {e}")
+            return None
+        
+        if solution is None or solution[0] is None:
+            return None
+        return int(solution[0].value)
     
+    def _query_cached(self, key: str, concept: Optional[str] = None, limit: int = 10) -> QueryResult:
+        """Run a prepared query, binding the concept literal and result limit"""
+        query = self._prepared[key].replace("__LIMIT__", str(int(limit)))
+        substitutions = {"label": ox.Literal(concept)} if concept is not None else None
+        return self.query_sparql(query, substitutions=substitutions)
+
     def find_related_documents(self, concept_text: str, limit: int = 10) -> List[Dict[str, str]]:
         """
         Find documents related to a specific concept.
         Used for sidebar updates when users click concept links.
         """
-        query = f"""
-        PREFIX slop: <http://slop.at/ontology#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX dct: <http://purl.org/dc/terms/>
-        
-        SELECT DISTINCT ?doc ?title ?confidence ?domain WHERE {{
-            ?concept rdfs:label "{concept_text}" .
-            ?doc slop:discusses ?concept .
-            OPTIONAL {{ ?doc dct:title ?title }}
-            OPTIONAL {{ ?doc slop:typeConfidence ?confidence }}
-            OPTIONAL {{ ?doc slop:primaryDomain ?domain }}
-        }}
-        ORDER BY DESC(?confidence)
-        LIMIT {limit}
-        """
-        
-        result = self.query_sparql(query)
+        result = self._query_cached("related_documents", concept_text, limit)
         return result.bindings
     
     def find_co_occurring_concepts(self, concept_text: str, limit: int = 10) -> List[Dict[str, str]]:
         """
         Find concepts that frequently co-occur with the given concept.
         """
-        query = f"""
-        PREFIX slop: <http://slop.at/ontology#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT ?related_concept (COUNT(?doc) as ?frequency) WHERE {{
-            ?concept rdfs:label "{concept_text}" .
-            ?concept slop:coOccursWith ?related .
-            ?related rdfs:label ?related_concept .
-            ?doc slop:discusses ?concept .
-            ?doc slop:discusses ?related .
-        }}
-        GROUP BY ?related_concept
-        ORDER BY DESC(?frequency)
-        LIMIT {limit}
-        """
-        
-        result = self.query_sparql(query)
+        result = self._query_cached("co_occurring_concepts", concept_text, limit)
         return result.bindings
     
     def get_document_stats(self) -> Dict[str, int]:
         """Get overall statistics about stored documents"""
-        queries = {
-            "total_documents": "SELECT (COUNT(DISTINCT ?doc) as ?count) WHERE { ?doc a slop:Document }",
-            "total_concepts": "SELECT (COUNT(DISTINCT ?concept) as ?count) WHERE { ?concept a slop:Concept }",
-            "conversations": "SELECT (COUNT(?doc) as ?count) WHERE { ?doc a slop:ConversationDocument }",
-            "markdown_docs": "SELECT (COUNT(?doc) as ?count) WHERE { ?doc a slop:MarkdownDocument }",
-        }
+        cached = self._stats_cache
+        now = monotonic()
+        if cached is not None and cached[0] == self._write_version and now - cached[1] < STATS_CACHE_TTL:
+            return dict(cached[2])
         
-        stats = {}
-        for stat_name, query in queries.items():
-            result = self.query_sparql(query)
-            if result.bindings:
-                stats[stat_name] = int(result.bindings[0].get('count', 0))
-            else:
-                stats[stat_name] = 0
+        try:
+            solution = next(iter(self.store.query(self._prepared["stats"])), None)
+        except Exception as e:
+            self.logger.error(f"SPARQL query error: {e}")
+            solution = None
         
-        return stats
+        if solution is None:
+            stats = dict.fromkeys(STATS_FIELDS, 0)
+        else:
+            stats = {
+                stat_name: int(value.value) if value is not None else 0
+                for stat_name, value in zip(STATS_FIELDS, solution)
+            }
+        self._stats_cache = (self._write_version, now, stats)
+        return dict(stats)
     
-    def export_document_turtle(self, doc_uri: str) -> Optional[str]:
-        """Export a specific document and its concepts as Turtle"""
-        query = f"""
+    def _document_triples(self, doc_uri: str):
+        """CONSTRUCT a document's triples plus those of the concepts it discusses"""
+        doc = ox.NamedNode(doc_uri)  # Rejects invalid IRIs before they reach the query text
+        query = SPARQL_PREFIXES + f"""
         CONSTRUCT {{
-            <{doc_uri}> ?p ?o .
+            {doc} ?p ?o .
             ?concept ?cp ?co .
         }}
         WHERE {{
-            <{doc_uri}> ?p ?o .
+            {doc} ?p ?o .
             OPTIONAL {{
-                <{doc_uri}> slop:discusses ?concept .
+                {doc} slop:discusses ?concept .
                 ?concept ?cp ?co .
             }}
         }}
         """
-        
+        return self.store.query(query)
+    
+    def export_document_turtle(self, doc_uri: str) -> Optional[str]:
+        """Export a specific document and its concepts as Turtle"""
         try:
-            results = self.store.query(query)
-            return results.serialize(format="text/turtle")
+            results = self._document_triples(doc_uri)
+            return results.serialize(format=ox.RdfFormat.TURTLE).decode('utf-8')
         except Exception as e:
             self.logger.error(f"Error exporting document: {e}")
             return None
     
+    def write_document_turtle(self, doc_uri: str, output: Union[str, Path, BinaryIO]) -> bool:
+        """
+        Stream a document export as Turtle to a file path or binary file object.
+        Triples are serialized as they are produced, so large exports never
+        exist as one in-memory string.
+        """
+        try:
+            results = self._document_triples(doc_uri)
+            results.serialize(output, format=ox.RdfFormat.TURTLE)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error exporting document: {e}")
+            return False
+    
     def clear_all_data(self) -> bool:
         """Clear all data from the store (for testing/reset)"""
+        self.flush()
+        self._write_version += 1
         try:
+            self._ontology_marker.unlink(missing_ok=True)
             self.store.clear()
             self._load_core_ontology()  # Reload core ontology
             return True
@@ -1,17 +1,38 @@
 """Main slop.at processing pipeline"""
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from pathlib import Path
+from collections import OrderedDict
+import hashlib
 import logging
+import mmap
+import os
 from dataclasses import dataclass
 
 from .parsers.text_parser import TextParser, DocumentMetadata
-from .parsers.gliner_extractor import ConceptExtractor, ConceptExtractionResult
+from .parsers.gliner_extractor import ConceptExtractor, ConceptExtractionResult, gliner_available
 from .parsers.ontology_mapper import OntologyMapper, SemanticMapping
 from .graph.store import SlopStore
 from .web.html_generator import HTMLGenerator, SlopPage, save_slop_page
+from .server.slop_files import count_slops
 
-@dataclass
+# Files at least this large are decoded straight from a memory map
+MMAP_THRESHOLD = 1 << 20
+
+# Recent analyses kept per processor, so reprocessing identical content skips the models
+ANALYSIS_CACHE_SIZE = 64
+
+# Recent pages kept per processor; fewer than analyses, since a page can run to megabytes
+PAGE_CACHE_SIZE = 16
+
+# batch_process bulk loads buffered graph writes every this many documents, so memory
+# stays bounded on large directories and an interruption loses at most one chunk
+BATCH_FLUSH_SIZE = 64
+
+# Where the web and MCP servers publish slop pages
+SLOPS_DIR = Path.home() / ".slopat" / "slops"
+
+@dataclass(slots=True)
 class ProcessingResult:
     """Complete result of processing a slop"""
     slop_page: SlopPage
@@ -31,7 +52,9 @@ class SlopProcessor:
         self,
         output_dir: Path = None,
         store: Optional[SlopStore] = None,
-        gliner_model: str = "urchade/gliner_base"
+        gliner_model: str = "urchade/gliner_base",
+        concept_cache_dir: Optional[Path] = None,
+        use_concept_cache: bool = True
     ):
         # Set up directories
         if output_dir is None:
@@ -40,8 +63,13 @@ class SlopProcessor:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize components
+        self.gliner_model = gliner_model
+        self.concept_cache_dir = concept_cache_dir  # None keeps ConceptExtractor's default
+        self.use_concept_cache = use_concept_cache
         self.text_parser = TextParser()
-        self.concept_extractor = ConceptExtractor(gliner_model)
+        self._concept_extractor: Optional[ConceptExtractor] = None  # Loaded on first extraction
+        self._analysis_cache: OrderedDict = OrderedDict()
+        self._page_cache: OrderedDict = OrderedDict()
         self.ontology_mapper = OntologyMapper()
         self.html_generator = HTMLGenerator()
         
@@ -54,7 +82,16 @@ class SlopProcessor:
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)
     
-    def process_file(self, file_path: Path) -> ProcessingResult:
+    @property
+    def concept_extractor(self) -> ConceptExtractor:
+        """GLiNER extractor, loaded on first use so stats/related/serve never load the model"""
+        if self._concept_extractor is None:
+            self._concept_extractor = ConceptExtractor(
+                self.gliner_model, cache_dir=self.concept_cache_dir, use_cache=self.use_concept_cache
+            )
+        return self._concept_extractor
+    
+    def process_file(self, file_path: Path, store_in_graph: bool = True) -> ProcessingResult:
         """
         Process a text file through the complete slop.at pipeline.
         Main entry point for file-based processing.
@@ -62,10 +99,9 @@ class SlopProcessor:
         self.logger.info(f"Processing file: {file_path}")
         
         # Read file content
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = _read_text(file_path)
         
-        return self.process_content(content, file_path=file_path)
+        return self.process_content(content, file_path=file_path, store_in_graph=store_in_graph)
     
     def process_content(
         self, 
@@ -78,36 +114,40 @@ class SlopProcessor:
         Core processing method inspired by CodeDoc's analysis flow.
         """
         try:
-            # Step 1: Document classification and parsing
-            self.logger.info("Step 1: Analyzing document structure...")
-            doc_metadata = self.text_parser.classify_document(content)
-            self.logger.info(f"Detected document type: {doc_metadata.doc_type} (confidence: {doc_metadata.confidence:.2f})")
-            
-            # Step 2: Concept extraction with GLiNER
-            self.logger.info("Step 2: Extracting concepts with GLiNER...")
-            extraction_result = self.concept_extractor.extract_concepts(content)
-            self.logger.info(f"Extracted {len(extraction_result.concepts)} concepts across {len(extraction_result.domain_distribution)} domains")
+            # Hashed once: keys the analysis cache and names content-addressed pages
+            content_digest = hashlib.sha256(content.encode('utf-8')).digest()
             
-            # Step 3: Ontology mapping and RDF generation
-            self.logger.info("Step 3: Mapping to ontologies and generating RDF...")
-            semantic_mapping = self.ontology_mapper.map_to_ontologies(
-                content, extraction_result, doc_metadata, file_path
-            )
-            self.logger.info(f"Generated {len(semantic_mapping.triples)} RDF triples")
+            # Steps 1-3 are pure, so repeated content reuses the cached analysis
+            doc_metadata, extraction_result, semantic_mapping = self._analyze(content, file_path, content_digest)
             
             # Step 4: Store in graph database
             graph_stored = False
             if store_in_graph:
                 self.logger.info("Step 4: Storing in graph database...")
                 graph_stored = self.store.store_semantic_mapping(semantic_mapping)
-                self.logger.info(f"Graph storage: {'success' if graph_stored else 'failed'}")
+                if not graph_stored:
+                    status = 'failed'
+                elif self.store.in_batch:
+                    status = 'buffered'  # Written when batch() flushes
+                else:
+                    status = 'success'
+                self.logger.info(f"Graph storage: {status}")
             
-            # Step 5: Generate beautiful HTML
-            self.logger.info("Step 5: Generating HTML page...")
-            slop_page = self.html_generator.generate_slop_page(
-                content, extraction_result, doc_metadata, semantic_mapping, file_path
-            )
-            self.logger.info(f"Generated HTML page: {slop_page.title}")
+            # Step 5: Generate beautiful HTML, unless this content's page is still cached
+            key = _cache_key(content_digest, file_path)
+            slop_page = self._page_cache.get(key)
+            if slop_page is not None:
+                self._page_cache.move_to_end(key)
+                self.logger.info("Step 5: Reusing HTML page of identical content")
+            else:
+                self.logger.info("Step 5: Generating HTML page...")
+                slop_page = self.html_generator.generate_slop_page(
+                    content, extraction_result, doc_metadata, semantic_mapping, file_path, content_digest
+                )
+                self.logger.info(f"Generated HTML page: {slop_page.title}")
+                self._page_cache[key] = slop_page
+                if len(self._page_cache) > PAGE_CACHE_SIZE:
+                    self._page_cache.popitem(last=False)
             
             # Step 6: Save HTML to disk
             self.logger.info("Step 6: Saving HTML page...")
@@ -127,24 +167,138 @@ class SlopProcessor:
             self.logger.error(f"Error processing content: {e}")
             raise
     
-    def batch_process(self, input_dir: Path, pattern: str = "*.txt") -> List[ProcessingResult]:
-        """Process multiple files in a directory"""
+    def _analyze(
+        self, content: str, file_path: Optional[Path], content_digest: bytes
+    ) -> Tuple[DocumentMetadata, ConceptExtractionResult, SemanticMapping]:
+        """
+        Classify, extract and map content, with no side effects.
+        Results are memoized on the content's SHA-256 and file path (which the mapping depends on).
+        """
+        key = _cache_key(content_digest, file_path)
+        cached = self._analysis_cache.get(key)
+        if cached is not None:
+            self._analysis_cache.move_to_end(key)
+            self.logger.info("Steps 1-3: Reusing analysis of identical content")
+            return cached
+        
+        # Step 1: Document classification and parsing
+        self.logger.info("Step 1: Analyzing document structure...")
+        doc_metadata = self.text_parser.classify_document(content)
+        self.logger.info(f"Detected document type: {doc_metadata.doc_type} (confidence: {doc_metadata.confidence:.2f})")
+        
+        # Step 2: Concept extraction with GLiNER
+        self.logger.info("Step 2: Extracting concepts with GLiNER...")
+        extraction_result = self.concept_extractor.extract_concepts(content)
+        self.logger.info(f"Extracted {len(extraction_result.concepts)} concepts across {len(extraction_result.domain_distribution)} domains")
+        
+        # Step 3: Ontology mapping and RDF generation
+        self.logger.info("Step 3: Mapping to ontologies and generating RDF...")
+        semantic_mapping = self.ontology_mapper.map_to_ontologies(
+            content, extraction_result, doc_metadata, file_path
+        )
+        self.logger.info(f"Generated {len(semantic_mapping.triples)} RDF triples")
+        
+        analysis = (doc_metadata, extraction_result, semantic_mapping)
+        self._analysis_cache[key] = analysis
+        if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+        return analysis
+    
+    def batch_process(
+        self,
+        input_dir: Path,
+        pattern: str = "*.txt",
+        workers: int = 1,
+        store_in_graph: bool = True
+    ) -> List[ProcessingResult]:
+        """
+        Process multiple files in a directory.
+        With more than one worker, files are analyzed in separate processes
+        (each loading its own model) and the results are stored here.
+        """
+        return self._batch_process(input_dir, pattern, workers, store_in_graph)[0]
+    
+    def _batch_process(
+        self, input_dir: Path, pattern: str, workers: int, store_in_graph: bool
+    ) -> Tuple[List[ProcessingResult], int]:
+        """batch_process, also returning the number of files matched"""
         self.logger.info(f"Batch processing files in {input_dir} matching {pattern}")
         
         results = []
-        files = list(input_dir.glob(pattern))
+        # Consumed lazily, so the first file is processed while the directory is still being listed
+        files = input_dir.glob(pattern)
+        file_count = 0
         
-        for i, file_path in enumerate(files):
-            self.logger.info(f"Processing file {i+1}/{len(files)}: {file_path.name}")
-            try:
-                result = self.process_file(file_path)
+        if workers > 1 and _cuda_available():
+            # A single GPU is shared serially; ConceptExtractor batches chunks to keep it busy
+            workers = 1
+        
+        # Defer graph writes so the directory lands in a few large bulk loads
+        with self.store.batch(flush_every=BATCH_FLUSH_SIZE) as failed:
+            if workers == 1:
+                for file_path in files:
+                    file_count += 1
+                    self.logger.info(f"Processing file {file_count}: {file_path.name}")
+                    try:
+                        result = self.process_file(file_path, store_in_graph=store_in_graph)
+                        results.append(result)
+                    except Exception as e:
+                        self.logger.error(f"Failed to process {file_path}: {e}")
+                        continue
+            else:
+                results, file_count = self._batch_process_parallel(files, workers, store_in_graph)
+        
+        # graph_stored only meant "buffered" inside the batch; correct it for mappings that didn't load
+        if failed:
+            failed_ids = {id(mapping) for mapping in failed}
+            for result in results:
+                if id(result.semantic_mapping) in failed_ids:
+                    result.graph_stored = False
+            self.logger.error(f"Graph storage failed for {len(failed)} of the batch's documents")
+        
+        self.logger.info(f"Batch processing complete: {len(results)}/{file_count} files processed successfully")
+        return results, file_count
+    
+    def _batch_process_parallel(
+        self, files: Iterable[Path], workers: int, store_in_graph: bool
+    ) -> Tuple[List[ProcessingResult], int]:
+        """
+        Analyze files in worker processes, storing each mapping as it comes back.
+        Returns the results and the number of files submitted.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        import multiprocessing
+        
+        self.logger.info(f"Processing files with up to {workers} worker processes")
+        
+        results = []
+        # spawn, not fork: each worker loads its own model instead of inheriting torch state
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.output_dir, self.store.data_dir, self.gliner_model,
+                self.concept_cache_dir, self.use_concept_cache, workers
+            )
+        ) as executor:
+            # Workers start on the first files while later ones are still being submitted
+            futures = {executor.submit(_process_one, file_path): file_path for file_path in files}
+            for i, future in enumerate(as_completed(futures)):
+                file_path = futures[future]
+                self.logger.info(f"Processed file {i+1}/{len(futures)}: {file_path.name}")
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to process {file_path}: {e}")
+                    continue
+                
+                # Workers only read the graph; writes go through this process's store
+                if store_in_graph:
+                    result.graph_stored = self.store.store_semantic_mapping(result.semantic_mapping)
                 results.append(result)
-            except Exception as e:
-                self.logger.error(f"Failed to process {file_path}: {e}")
-                continue
         
-        self.logger.info(f"Batch processing complete: {len(results)}/{len(files)} files processed successfully")
-        return results
+        return results, len(futures)
     
     def find_related_slops(self, concept_text: str, limit: int = 10) -> List[Dict[str, str]]:
         """Find slops related to a specific concept"""
@@ -158,16 +312,17 @@ class SlopProcessor:
         """Get overall processing statistics"""
         graph_stats = self.store.get_document_stats()
         
-        # Add file system stats
-        html_files = list(self.output_dir.glob("*.html"))
+        # Add file system stats (published slops, not the index pages)
+        html_files = count_slops(self.output_dir)
         
         return {
             "graph_database": graph_stats,
-            "html_files": len(html_files),
+            "html_files": html_files,
             "output_directory": str(self.output_dir),
             "components_loaded": {
                 "text_parser": True,
-                "concept_extractor": hasattr(self.concept_extractor, 'model'),
+                # The model loads on first extraction, so report whether it can be, not whether it has been
+                "concept_extractor": self._concept_extractor is not None or gliner_available(),
                 "ontology_mapper": True,
                 "html_generator": True,
                 "graph_store": True
@@ -176,19 +331,93 @@ class SlopProcessor:
     
     def export_document_turtle(self, slop_url: str) -> Optional[str]:
         """Export a specific slop as RDF Turtle"""
-        # Convert URL path to document URI
-        doc_uri = f"http://slop.at/ontology#document/{slop_url.lstrip('/')}"
-        return self.store.export_document_turtle(doc_uri)
+        return self.store.export_document_turtle(self._document_uri(slop_url))
+    
+    def write_document_turtle(self, slop_url: str, output) -> bool:
+        """Stream a specific slop as RDF Turtle to a file path or binary file"""
+        return self.store.write_document_turtle(self._document_uri(slop_url), output)
+    
+    def _document_uri(self, slop_url: str) -> str:
+        """Convert URL path to document URI"""
+        return f"http://slop.at/ontology#document/{slop_url.lstrip('/')}"
+
+def _cache_key(content_digest: bytes, file_path: Optional[Path]) -> Tuple[bytes, Optional[str]]:
+    """Key for the analysis and page caches: both depend only on the content and file path"""
+    return content_digest, str(file_path) if file_path else None
+
+def _read_text(file_path: Path) -> str:
+    """Read a UTF-8 file; large files are decoded from a memory map without an intermediate bytes copy"""
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            content = f.read().decode('utf-8')
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    content = str(view, 'utf-8')
+    
+    # Match text-mode reads, which translate \r\n and \r line endings
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+# Batch worker state: one processor per worker process, built by _init_worker
+_worker_processor: Optional[SlopProcessor] = None
+
+def _init_worker(
+    output_dir: Path, data_dir: Path, gliner_model: str,
+    concept_cache_dir: Optional[Path], use_concept_cache: bool, workers: int
+):
+    """Build the worker's processor on a read-only view of the parent's store"""
+    global _worker_processor
+    
+    # torch defaults to every core in each process; split the cores between the workers instead
+    import torch
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    
+    _worker_processor = SlopProcessor(
+        output_dir=output_dir,
+        store=SlopStore(data_dir, read_only=True),
+        gliner_model=gliner_model,
+        concept_cache_dir=concept_cache_dir,
+        use_concept_cache=use_concept_cache
+    )
+
+def _process_one(file_path: Path) -> ProcessingResult:
+    """Process one file in a worker, leaving graph storage to the parent"""
+    return _worker_processor.process_file(file_path, store_in_graph=False)
+
+def _cuda_available() -> bool:
+    """Whether GLiNER would run on a CUDA device"""
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
 
 # Convenience functions for simple usage
-def process_file_simple(file_path: Path, output_dir: Path = None) -> ProcessingResult:
+_shared_processors: Dict[bool, "SlopProcessor"] = {}
+
+def get_processor(read_only: bool = False) -> SlopProcessor:
+    """
+    Shared processor publishing to SLOPS_DIR, created on first use.
+    Servers running in one process share it rather than each opening the store
+    and loading models; a writable processor also serves read-only callers.
+    """
+    processor = _shared_processors.get(False) or _shared_processors.get(read_only)
+    if processor is None:
+        store = SlopStore(read_only=True) if read_only else None
+        processor = _shared_processors[read_only] = SlopProcessor(output_dir=SLOPS_DIR, store=store)
+    return processor
+
+def process_file_simple(file_path: Path, output_dir: Path = None, use_concept_cache: bool = True) -> ProcessingResult:
     """Simple file processing without persistence"""
-    processor = SlopProcessor(output_dir=output_dir)
+    processor = SlopProcessor(output_dir=output_dir, use_concept_cache=use_concept_cache)
     return processor.process_file(file_path)
 
-def process_text_simple(content: str, output_dir: Path = None) -> ProcessingResult:
+def process_text_simple(content: str, output_dir: Path = None, use_concept_cache: bool = True) -> ProcessingResult:
     """Simple text processing without persistence"""
-    processor = SlopProcessor(output_dir=output_dir)
+    processor = SlopProcessor(output_dir=output_dir, use_concept_cache=use_concept_cache)
     return processor.process_content(content)
 
 def main():
@@ -196,7 +425,6 @@ def main():
     import click
     from rich.console import Console
     from rich.table import Table
-    from rich.progress import track
     
     console = Console()
     
@@ -213,12 +441,21 @@ def main():
     @click.argument('input_path', type=click.Path(exists=True))
     @click.option('--output', '-o', type=click.Path(), help='Output directory')
     @click.option('--no-graph', is_flag=True, help='Skip graph database storage')
-    def process(input_path, output, no_graph):
+    @click.option('--workers', '-w', type=click.IntRange(min=1), default=1,
+                  help='Worker processes for directories, each loading its own model (default: 1)')
+    @click.option('--no-cache', is_flag=True, help='Skip the on-disk concept extraction cache')
+    @click.option('--cache-dir', type=click.Path(file_okay=False),
+                  help='Concept extraction cache directory (default: ~/.slopat/cache/concepts)')
+    def process(input_path, output, no_graph, workers, no_cache, cache_dir):
         """Process a single file or directory of files"""
         input_path = Path(input_path)
         output_dir = Path(output) if output else None
         
-        processor = SlopProcessor(output_dir=output_dir)
+        processor = SlopProcessor(
+            output_dir=output_dir,
+            concept_cache_dir=Path(cache_dir) if cache_dir else None,
+            use_concept_cache=not no_cache
+        )
         
         if input_path.is_file():
             console.print(f"[blue]Processing:[/blue] {input_path}")
@@ -245,24 +482,23 @@ def main():
                 raise click.Abort()
                 
         elif input_path.is_dir():
-            files = list(input_path.glob("*.md"))
+            # The directory is listed once, lazily, by the batch itself
+            console.print(f"[blue]Batch processing .md files in {input_path}...[/blue]")
+            
+            results, file_count = processor._batch_process(
+                input_path, "*.md", workers=workers, store_in_graph=not no_graph
+            )
             
-            if not files:
+            if not file_count:
                 console.print(f"[yellow]No .md files found in {input_path}[/yellow]")
                 console.print("[dim]Focusing on markdown files for structured browsing[/dim]")
                 return
-                
-            console.print(f"[blue]Batch processing {len(files)} files...[/blue]")
-            
-            results = []
-            for file_path in track(files, description="Processing..."):
-                try:
-                    result = processor.process_file(file_path)
-                    results.append(result)
-                except Exception as e:
-                    console.print(f"[red]Failed to process {file_path}: {e}[/red]")
             
-            console.print(f"\n[green]✓ Processed {len(results)}/{len(files)} files successfully[/green]")
+            console.print(f"\n[green]✓ Processed {len(results)}/{file_count} files successfully[/green]")
+            if not no_graph:
+                unstored = sum(1 for result in results if not result.graph_stored)
+                if unstored:
+                    console.print(f"[yellow]{unstored} of them could not be stored in the graph[/yellow]")
             
             # Show results table
             table = Table(title="Processing Results")
@@ -375,7 +611,6 @@ def main():
     def serve(port, host, output):
         """Start a web server to browse generated slop pages"""
         import http.server
-        import socketserver
         import webbrowser
         import threading
         import time
@@ -407,9 +642,9 @@ def main():
         os.chdir(output_dir)
         
         try:
-            # Create HTTP server
+            # Create HTTP server; one thread per request so parallel asset fetches don't queue
             handler = http.server.SimpleHTTPRequestHandler
-            httpd = socketserver.TCPServer((host, port), handler)
+            httpd = http.server.ThreadingHTTPServer((host, port), handler)
             
             # Auto-open browser after a short delay
             def open_browser():
@@ -1,17 +1,96 @@
 """GLiNER-based concept extraction for slop.at"""
 
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Any, List, Dict, Set, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
+import hashlib
+import heapq
+import importlib.metadata
+import importlib.util
+import os
+import pickle
 import re
+import sys
+import tempfile
 
-try:
-    from gliner import GLiNER
-except ImportError:
-    print("GLiNER not installed. Install with: pip install gliner")
-    GLiNER = None
+# gliner (and torch behind it) is imported by _load_gliner() when the first
+# ConceptExtractor is created, so importing slopat doesn't pay for it
+GLiNER = None
 
-@dataclass
+def _load_gliner():
+    """Import GLiNER on first use and cache it as the module global"""
+    global GLiNER
+    if GLiNER is None:
+        try:
+            from gliner import GLiNER as gliner_class
+        except ImportError:
+            raise ImportError(
+                "GLiNER is required for concept extraction. Install with: pip install gliner"
+            ) from None
+        GLiNER = gliner_class
+    return GLiNER
+
+def gliner_available() -> bool:
+    """Whether GLiNER can be loaded, checked without importing it"""
+    return GLiNER is not None or importlib.util.find_spec("gliner") is not None
+
+# Part of every cache key; bump when ConceptExtractionResult or extraction output changes
+CONCEPT_CACHE_VERSION = 1
+
+# Most cached extraction results kept on disk; the least recently used are dropped beyond this
+CONCEPT_CACHE_MAX_ENTRIES = 1000
+
+def _gliner_version() -> str:
+    """Installed GLiNER version, for cache keys"""
+    try:
+        return importlib.metadata.version("gliner")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+# Mirrors GLiNER's own word splitter, so chunk sizes are counted in model tokens
+WORD_PATTERN = re.compile(r'\w+(?:[-_]\w+)*|\S')
+
+# Markdown stripped before extraction; formatting markers keep their inner text
+WHITESPACE_PATTERN = re.compile(r'\s+')
+CODE_BLOCK_PATTERN = re.compile(r'```.*?```', re.DOTALL)
+FORMATTING_PATTERN = re.compile(r'\*\*(.*?)\*\*|\*(.*?)\*|`(.*?)`', re.DOTALL)  # Bold, italic, inline code
+
+# Above this many spans, deduplication runs as a Numba kernel when numba is installed
+NUMBA_DEDUP_THRESHOLD = 5000
+
+def _dedup_mask(starts, ends, confidence, keep):
+    """
+    Sweep spans sorted by start, marking which ones survive deduplication.
+    Same rules as ConceptExtractor._deduplicate_concepts, over plain arrays.
+    """
+    last = -1
+    for i in range(len(starts)):
+        if last >= 0 and not (ends[i] <= starts[last] or ends[last] <= starts[i]):
+            # Keep the one with higher confidence
+            if confidence[i] > confidence[last]:
+                keep[last] = False
+                keep[i] = True
+                last = i
+        else:
+            keep[i] = True
+            last = i
+    return keep
+
+_dedup_mask_kernel = None
+
+def _get_dedup_mask_kernel():
+    """JIT-compile _dedup_mask on first use; None if numba isn't installed"""
+    global _dedup_mask_kernel
+    if _dedup_mask_kernel is None:
+        try:
+            import numba
+        except ImportError:
+            _dedup_mask_kernel = False
+        else:
+            _dedup_mask_kernel = numba.njit(_dedup_mask)
+    return _dedup_mask_kernel or None
+
+@dataclass(slots=True)
 class ExtractedConcept:
     """Represents a concept extracted by GLiNER"""
     text: str
@@ -21,13 +100,13 @@ class ExtractedConcept:
     confidence: float
     context: str  # Surrounding text for disambiguation
 
-@dataclass
+@dataclass(slots=True)
 class ConceptExtractionResult:
     """Results of concept extraction from a document"""
     concepts: List[ExtractedConcept]
     domain_distribution: Dict[str, int]
     concept_density: float
-    processing_metadata: Dict[str, any]
+    processing_metadata: Dict[str, Any]
 
 class ConceptExtractor:
     """
@@ -35,12 +114,33 @@ class ConceptExtractor:
     Inspired by CodeDoc's AST extraction patterns.
     """
     
-    def __init__(self, model_name: str = "urchade/gliner_base"):
-        """Initialize GLiNER model with standard ontology labels"""
-        if GLiNER is None:
-            raise ImportError("GLiNER is required for concept extraction")
-            
-        self.model = GLiNER.from_pretrained(model_name)
+    def __init__(
+        self,
+        model_name: str = "urchade/gliner_base",
+        batch_size: int = 16,
+        device: Optional[str] = None,
+        dtype: Optional[str] = None,
+        cache_dir: Optional[Path] = None,
+        use_cache: bool = True,
+        compile_model: Optional[bool] = None
+    ):
+        """
+        Initialize GLiNER model with standard ontology labels.
+        device defaults to cuda, then mps, then cpu; dtype defaults to float32, and
+        "bfloat16" or "float16" trade some accuracy for speed. Extraction results
+        are cached on disk under cache_dir unless use_cache is False. compile_model
+        runs the transformer through torch.compile (default: SLOPAT_COMPILE=1/true/yes).
+        """
+        self.model = _load_gliner().from_pretrained(model_name)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threshold = 0.3  # Adjust based on precision/recall needs
+        
+        if cache_dir is None:
+            cache_dir = Path.home() / ".slopat" / "cache" / "concepts"
+        self.cache_dir = Path(cache_dir) if use_cache else None
+        self._cache_version = (CONCEPT_CACHE_VERSION, _gliner_version())
+        self.device = self._place_model(device, dtype)
         
         # Standard ontology labels for slop.at
         # These map to our domain ontologies
@@ -119,6 +219,11 @@ class ConceptExtractor:
             "tool": "tools",
             "framework": "tools",
         }
+        
+        if compile_model is None:
+            compile_model = os.environ.get("SLOPAT_COMPILE", "").lower() in ("1", "true", "yes")
+        if compile_model:
+            self._compile_model()
     
     def extract_concepts(self, content: str, context_window: int = 50) -> ConceptExtractionResult:
         """
@@ -128,67 +233,222 @@ class ConceptExtractor:
         # Clean and prepare text
         cleaned_content = self._preprocess_text(content)
         
-        # Extract entities using GLiNER
-        entities = self.model.predict_entities(
-            cleaned_content, 
-            self.ontology_labels,
-            threshold=0.3  # Adjust based on precision/recall needs
-        )
+        # Identical text under the same model, labels and threshold gives identical results
+        cache_path = self._cache_path(cleaned_content, context_window)
+        cached = self._load_cached(cache_path)
+        if cached is not None:
+            return cached
+        
+        # Extract entities using GLiNER, one batched pass over overlapping chunks
+        chunks = self._chunk_text(cleaned_content)
+        chunk_entities = self._predict_chunks([text for text, _ in chunks])
         
-        # Convert to our concept format with context
+        # Convert to our concept format with context, shifting offsets back into the document
         concepts = []
-        for entity in entities:
-            context = self._extract_context(
-                cleaned_content, 
-                entity['start'], 
-                entity['end'], 
-                context_window
-            )
-            
-            concept = ExtractedConcept(
-                text=entity['text'],
-                label=entity['label'],
-                start=entity['start'],
-                end=entity['end'],
-                confidence=entity.get('score', 0.0),
-                context=context
-            )
-            concepts.append(concept)
-        
-        # Remove duplicates and overlaps
+        for (_, base_offset), entities in zip(chunks, chunk_entities):
+            for entity in entities:
+                start = entity['start'] + base_offset
+                end = entity['end'] + base_offset
+                context = self._extract_context(
+                    cleaned_content, 
+                    start, 
+                    end, 
+                    context_window
+                )
+                
+                concept = ExtractedConcept(
+                    text=entity['text'],
+                    label=sys.intern(entity['label']),  # Shared across every concept with this label
+                    start=start,
+                    end=end,
+                    confidence=entity.get('score', 0.0),
+                    context=context
+                )
+                concepts.append(concept)
+        
+        # Remove duplicates and overlaps (including repeats from chunk overlap zones)
         concepts = self._deduplicate_concepts(concepts)
         
         # Calculate metadata
-        domain_distribution = self._calculate_domain_distribution(concepts)
-        concept_density = len(concepts) / len(cleaned_content.split()) if cleaned_content else 0
+        domain_distribution, unique_labels, total_confidence = self._summarize_concepts(concepts)
+        # _preprocess_text leaves words separated by single spaces, so count them without splitting
+        word_count = cleaned_content.count(' ') + 1 if cleaned_content else 0
+        concept_density = len(concepts) / word_count if word_count else 0
         
         processing_metadata = {
             'total_concepts': len(concepts),
-            'unique_labels': len(set(c.label for c in concepts)),
-            'avg_confidence': sum(c.confidence for c in concepts) / len(concepts) if concepts else 0,
+            'unique_labels': unique_labels,
+            'avg_confidence': total_confidence / len(concepts) if concepts else 0,
             'content_length': len(cleaned_content),
         }
         
-        return ConceptExtractionResult(
+        result = ConceptExtractionResult(
             concepts=concepts,
             domain_distribution=domain_distribution,
             concept_density=concept_density,
             processing_metadata=processing_metadata
         )
+        self._store_cached(cache_path, result)
+        return result
+    
+    def _cache_path(self, cleaned_content: str, context_window: int) -> Optional[Path]:
+        """Cache file for an extraction, keyed on the text and every setting that affects it"""
+        if self.cache_dir is None:
+            return None
+        
+        digest = hashlib.sha256(cleaned_content.encode('utf-8'))
+        # Device and dtype change model outputs slightly, so cached results stay per placement
+        settings = (
+            self._cache_version, self.model_name, str(self.device), self.dtype,
+            tuple(self.ontology_labels), self.threshold, context_window
+        )
+        digest.update(repr(settings).encode('utf-8'))
+        return self.cache_dir / f"{digest.hexdigest()}.pkl"
+    
+    def _load_cached(self, cache_path: Optional[Path]) -> Optional[ConceptExtractionResult]:
+        """Load a cached extraction result, ignoring missing or unreadable entries"""
+        if cache_path is None:
+            return None
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                result = pickle.load(f)
+        except Exception:
+            # Missing, stale or corrupt entry; a fresh result overwrites it
+            return None
+        
+        try:
+            # Entries are evicted oldest mtime first, so a hit marks this one recently used
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return result
+    
+    def _store_cached(self, cache_path: Optional[Path], result: ConceptExtractionResult):
+        """Write a result to the cache atomically so concurrent readers never see a partial file"""
+        if cache_path is None:
+            return
+        
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict_cached(cache_path.parent)
+        except OSError:
+            # Caching is best-effort; an unwritable cache dir shouldn't fail extraction
+            pass
+    
+    def _evict_cached(self, cache_dir: Path):
+        """Drop the least recently used entries beyond CONCEPT_CACHE_MAX_ENTRIES"""
+        with os.scandir(cache_dir) as entries:
+            cached = [(entry.stat().st_mtime_ns, entry.path) for entry in entries if entry.name.endswith('.pkl')]
+        
+        excess = len(cached) - CONCEPT_CACHE_MAX_ENTRIES
+        if excess > 0:
+            for _, path in heapq.nsmallest(excess, cached):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass  # Already evicted by another process
     
     def _preprocess_text(self, content: str) -> str:
         """Clean and prepare text for concept extraction"""
-        # Remove excessive whitespace
-        content = re.sub(r'\s+', ' ', content)
+        # Remove markdown formatting that might confuse GLiNER.
+        # Code blocks go first so the inline-code pattern can't split their fences.
+        content = CODE_BLOCK_PATTERN.sub('', content)
+        content = FORMATTING_PATTERN.sub(lambda match: match.group(match.lastindex), content)
         
-        # Remove markdown formatting that might confuse GLiNER
-        content = re.sub(r'\*\*(.*?)\*\*', r'\1', content)  # Bold
-        content = re.sub(r'\*(.*?)\*', r'\1', content)      # Italic
-        content = re.sub(r'`(.*?)`', r'\1', content)        # Inline code
-        content = re.sub(r'```.*?```', '', content, flags=re.DOTALL)  # Code blocks
+        # Remove excessive whitespace
+        content = WHITESPACE_PATTERN.sub(' ', content)
         
         return content.strip()
     
+    def _chunk_text(self, content: str, max_tokens: int = 384, overlap: int = 32) -> List[Tuple[str, int]]:
+        """
+        Split text into overlapping windows that fit GLiNER's max sequence length.
+        Returns (chunk_text, base_offset) pairs, where base_offset is the chunk's
+        character position in content.
+        """
+        words = [match.span() for match in WORD_PATTERN.finditer(content)]
+        if len(words) <= max_tokens:
+            return [(content, 0)] if content else []
+        
+        chunks = []
+        step = max_tokens - overlap
+        for first in range(0, len(words), step):
+            last = min(first + max_tokens, len(words)) - 1
+            start, end = words[first][0], words[last][1]
+            chunks.append((content[start:end], start))
+            if last == len(words) - 1:
+                break
+        return chunks
+    
+    def _place_model(self, device: Optional[str], dtype: Optional[str]) -> str:
+        """Move the model to the fastest available device, in float32 unless dtype asks otherwise"""
+        import torch
+        
+        if device is None:
+            if torch.cuda.is_available():
+                device = "cuda"
+            elif torch.backends.mps.is_available():
+                device = "mps"
+            else:
+                device = "cpu"
+        
+        # Reduced precision shifts span scores near the threshold, so it is opt-in
+        if dtype is None:
+            dtype = "float32"
+        
+        # GLiNER.to() only takes a device, so cast the wrapped transformer directly
+        self.model.to(device)
+        if dtype != "float32":
+            self.model.model.to(dtype=getattr(torch, dtype))
+        self.model.eval()
+        self.dtype = dtype
+        return device
+    
+    def _compile_model(self):
+        """Compile the transformer with dynamic shapes and warm it up"""
+        import torch
+        
+        # Chunk lengths and the final batch size vary per document, so compile with dynamic
+        # shapes rather than one graph per shape; the default mode also avoids keeping
+        # CUDA graph memory for every shape seen
+        self.model.model = torch.compile(self.model.model, dynamic=True)
+        
+        # A full batch of long text compiles the general graph; a single short text covers
+        # the size-1 specialisation. Both happen here rather than mid-document
+        self._predict_chunks([" ".join(["warm up"] * 128)] * max(self.batch_size, 2))
+        self._predict_chunks(["warm up"])
+    
+    def _predict_chunks(self, texts: List[str]) -> List[List[Dict]]:
+        """Run GLiNER over the chunks in batches of batch_size"""
+        import torch
+        
+        with torch.inference_mode():
+            batch_predict = getattr(self.model, "batch_predict_entities", None)
+            if batch_predict is None:
+                # Older GLiNER releases only predict one text at a time
+                return [
+                    self.model.predict_entities(text, self.ontology_labels, threshold=self.threshold)
+                    for text in texts
+                ]
+            
+            results = []
+            for i in range(0, len(texts), self.batch_size):
+                results.extend(batch_predict(
+                    texts[i:i + self.batch_size],
+                    self.ontology_labels,
+                    threshold=self.threshold
+                ))
+            return results
+    
     def _extract_context(self, content: str, start: int, end: int, window: int) -> str:
         """Extract surrounding context for a concept"""
         context_start = max(0, start - window)
@@ -197,38 +457,61 @@ class ConceptExtractor:
     
     def _deduplicate_concepts(self, concepts: List[ExtractedConcept]) -> List[ExtractedConcept]:
         """Remove duplicate and overlapping concepts"""
-        # Sort by start position
-        concepts.sort(key=lambda x: x.start)
+        # Sort by start position, most confident first among equal starts
+        concepts.sort(key=lambda x: (x.start, -x.confidence))
+        
+        if len(concepts) >= NUMBA_DEDUP_THRESHOLD:
+            kernel = _get_dedup_mask_kernel()
+            if kernel is not None:
+                return self._deduplicate_compiled(concepts, kernel)
         
+        # Kept concepts never overlap and are ordered by start, so the last one
+        # has the furthest end and is the only one a later concept can overlap
         deduplicated = []
         for concept in concepts:
-            # Check for overlap with existing concepts
-            overlap = False
-            for existing in deduplicated:
-                if self._concepts_overlap(concept, existing):
-                    # Keep the one with higher confidence
-                    if concept.confidence > existing.confidence:
-                        deduplicated.remove(existing)
-                        deduplicated.append(concept)
-                    overlap = True
-                    break
-            
-            if not overlap:
+            if deduplicated and self._concepts_overlap(concept, deduplicated[-1]):
+                # Keep the one with higher confidence
+                if concept.confidence > deduplicated[-1].confidence:
+                    deduplicated[-1] = concept
+            else:
                 deduplicated.append(concept)
         
         return deduplicated
     
+    def _deduplicate_compiled(self, concepts: List[ExtractedConcept], kernel) -> List[ExtractedConcept]:
+        """Run the deduplication sweep as a compiled kernel over span arrays"""
+        import numpy as np
+        
+        count = len(concepts)
+        starts = np.fromiter((c.start for c in concepts), dtype=np.int64, count=count)
+        ends = np.fromiter((c.end for c in concepts), dtype=np.int64, count=count)
+        # float64 so confidence ties break exactly as they do in Python
+        confidence = np.fromiter((c.confidence for c in concepts), dtype=np.float64, count=count)
+        keep = kernel(starts, ends, confidence, np.zeros(count, dtype=np.bool_))
+        return [concept for concept, kept in zip(concepts, keep) if kept]
+    
     def _concepts_overlap(self, c1: ExtractedConcept, c2: ExtractedConcept) -> bool:
         """Check if two concepts overlap in text position"""
         return not (c1.end <= c2.start or c2.end <= c1.start)
     
-    def _calculate_domain_distribution(self, concepts: List[ExtractedConcept]) -> Dict[str, int]:
-        """Calculate distribution of concepts across domains"""
-        distribution = {}
+    def _summarize_concepts(self, concepts: List[ExtractedConcept]) -> Tuple[Dict[str, int], int, float]:
+        """
+        Calculate distribution of concepts across domains, the number of distinct
+        labels and the total confidence, in a single pass.
+        """
+        label_counts = {}
+        total_confidence = 0.0
         for concept in concepts:
-            domain = self.domain_mapping.get(concept.label, "other")
-            distribution[domain] = distribution.get(domain, 0) + 1
-        return distribution
+            label = concept.label
+            label_counts[label] = label_counts.get(label, 0) + 1
+            total_confidence += concept.confidence
+        
+        # Labels come from a small fixed set, so resolve domains per label rather than per concept
+        distribution = {}
+        for label, count in label_counts.items():
+            domain = self.domain_mapping.get(label, "other")
+            distribution[domain] = distribution.get(domain, 0) + count
+        return distribution, len(label_counts), total_confidence
 
 def extract_concepts_from_file(file_path: Path) -> ConceptExtractionResult:
     """
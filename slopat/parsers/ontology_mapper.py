@@ -1,25 +1,112 @@
 """Map extracted concepts to standard ontologies and generate RDF"""
 
-from typing import List, Dict, Set, Optional, Tuple
+from typing import List, Dict, Set, Optional, Tuple, TextIO
+from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 import hashlib
+import io
+import sys
 import uuid
 from urllib.parse import quote
 
 from .gliner_extractor import ExtractedConcept, ConceptExtractionResult
 from .text_parser import DocumentMetadata, DocumentType
 
-@dataclass
+# Predicate, type and datatype URIs shared by every triple that uses them
+RDF_TYPE = sys.intern("rdf:type")
+RDFS_LABEL = sys.intern("rdfs:label")
+DCT_TITLE = sys.intern("dct:title")
+SLOP_DOCUMENT = sys.intern("slop:Document")
+SLOP_CONCEPT = sys.intern("slop:Concept")
+SLOP_DISCUSSES = sys.intern("slop:discusses")
+SLOP_TYPE_CONFIDENCE = sys.intern("slop:typeConfidence")
+SLOP_CONFIDENCE = sys.intern("slop:confidence")
+SLOP_GLINER_LABEL = sys.intern("slop:glinerLabel")
+SLOP_START_POSITION = sys.intern("slop:startPosition")
+SLOP_END_POSITION = sys.intern("slop:endPosition")
+SLOP_CONTEXT = sys.intern("slop:context")
+SLOP_FILE_PATH = sys.intern("slop:filePath")
+SLOP_CO_OCCURS_WITH = sys.intern("slop:coOccursWith")
+SLOP_PRIMARY_DOMAIN = sys.intern("slop:primaryDomain")
+XSD_FLOAT = sys.intern("http://www.w3.org/2001/XMLSchema#float")
+XSD_INTEGER = sys.intern("http://www.w3.org/2001/XMLSchema#integer")
+XSD_BOOLEAN = sys.intern("http://www.w3.org/2001/XMLSchema#boolean")
+
+# Escapes for double-quoted literals in Turtle, N-Triples/N-Quads and SPARQL queries
+LITERAL_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+})
+
+# Class URI for each document type, e.g. slop:ConversationDocument
+DOC_TYPE_URIS = {
+    doc_type: sys.intern(f"slop:{doc_type.value.title()}Document")
+    for doc_type in DocumentType
+}
+
+# Concepts starting within this many characters of each other co-occur
+CO_OCCURRENCE_WINDOW = 100
+
+# Above this many concepts, the co-occurrence sweep runs as a Numba kernel when numba is installed
+NUMBA_COOCCURRENCE_THRESHOLD = 2000
+
+def _cooccurrence_sweep(order, sorted_starts, window):
+    """
+    Sweep positions sorted by start, returning an (n, 2) array of index pairs
+    (lower index first) that start less than window apart. Counts the pairs
+    first so the output can be allocated once.
+    """
+    n = len(order)
+    count = 0
+    for a in range(n):
+        b = a + 1
+        while b < n and sorted_starts[b] - sorted_starts[a] < window:
+            b += 1
+        count += b - a - 1
+    
+    pairs = np.empty((count, 2), dtype=np.int64)
+    k = 0
+    for a in range(n):
+        b = a + 1
+        while b < n and sorted_starts[b] - sorted_starts[a] < window:
+            i = order[a]
+            j = order[b]
+            pairs[k, 0] = min(i, j)
+            pairs[k, 1] = max(i, j)
+            k += 1
+            b += 1
+    return pairs
+
+np = None  # Imported with numba by _get_cooccurrence_kernel
+_cooccurrence_kernel = None
+
+def _get_cooccurrence_kernel():
+    """JIT-compile _cooccurrence_sweep on first use; None if numba isn't installed"""
+    global _cooccurrence_kernel, np
+    if _cooccurrence_kernel is None:
+        try:
+            import numba
+            import numpy as np
+        except ImportError:
+            _cooccurrence_kernel = False
+        else:
+            _cooccurrence_kernel = numba.njit(_cooccurrence_sweep)
+    return _cooccurrence_kernel or None
+
+@dataclass(slots=True, frozen=True)
 class RDFTriple:
-    """Represents an RDF triple"""
+    """Represents an RDF triple (immutable and hashable)"""
     subject: str
     predicate: str
     object: str
     object_type: str = "uri"  # "uri", "literal", "typed_literal"
     datatype: Optional[str] = None
 
-@dataclass 
+@dataclass(slots=True)
 class SemanticMapping:
     """Results of mapping concepts to semantic ontologies"""
     triples: List[RDFTriple]
@@ -46,6 +133,8 @@ class OntologyMapper:
             "msc": "http://msc2010.org/",        # Mathematics Subject Classification
             "schema": "http://schema.org/",
         }
+        self._concept_prefix = f"{self.namespaces['slop']}concept/"
+        self._domain_predicates: Dict[str, str] = {}  # Domain -> slop:covers<Domain>
         
         # Concept mappings to standard ontologies
         self.concept_mappings = {
@@ -128,6 +217,10 @@ class OntologyMapper:
         
         relationships_created = len(relationship_triples) + len(domain_triples)
         
+        # Drop repeated triples (e.g. from repeated concept mentions), keeping
+        # first-seen order so the Turtle output stays stable
+        triples = list(dict.fromkeys(triples))
+        
         return SemanticMapping(
             triples=triples,
             namespaces=self.namespaces,
@@ -142,7 +235,7 @@ class OntologyMapper:
             identifier = str(file_path.stem)
         else:
             # Use content hash for uploaded content
-            content_hash = hashlib.sha256(content.encode()).hexdigest()[:8]
+            content_hash = hashlib.sha256(content.encode()).digest()[:4].hex()
             identifier = f"doc-{content_hash}"
         
         return f"{self.namespaces['slop']}document/{quote(identifier)}"
@@ -159,32 +252,31 @@ class OntologyMapper:
         # Basic document type
         triples.append(RDFTriple(
             doc_uri, 
-            "rdf:type", 
-            "slop:Document"
+            RDF_TYPE, 
+            SLOP_DOCUMENT
         ))
         
         # Document type classification
-        doc_type_uri = f"slop:{doc_metadata.doc_type.value.title()}Document"
         triples.append(RDFTriple(
             doc_uri,
-            "rdf:type", 
-            doc_type_uri
+            RDF_TYPE, 
+            DOC_TYPE_URIS[doc_metadata.doc_type]
         ))
         
         # Confidence score
         triples.append(RDFTriple(
             doc_uri,
-            "slop:typeConfidence",
+            SLOP_TYPE_CONFIDENCE,
             str(doc_metadata.confidence),
             object_type="typed_literal",
-            datatype="http://www.w3.org/2001/XMLSchema#float"
+            datatype=XSD_FLOAT
         ))
         
         # Title if available
         if doc_metadata.suggested_title:
             triples.append(RDFTriple(
                 doc_uri,
-                "dct:title",
+                DCT_TITLE,
                 doc_metadata.suggested_title,
                 object_type="literal"
             ))
@@ -194,25 +286,25 @@ class OntologyMapper:
             if isinstance(value, (int, float)):
                 triples.append(RDFTriple(
                     doc_uri,
-                    f"slop:{key}",
+                    sys.intern(f"slop:{key}"),
                     str(value),
                     object_type="typed_literal",
-                    datatype="http://www.w3.org/2001/XMLSchema#float" if isinstance(value, float) else "http://www.w3.org/2001/XMLSchema#integer"
+                    datatype=XSD_FLOAT if isinstance(value, float) else XSD_INTEGER
                 ))
             elif isinstance(value, bool):
                 triples.append(RDFTriple(
                     doc_uri,
-                    f"slop:{key}",
+                    sys.intern(f"slop:{key}"),
                     str(value).lower(),
                     object_type="typed_literal", 
-                    datatype="http://www.w3.org/2001/XMLSchema#boolean"
+                    datatype=XSD_BOOLEAN
                 ))
         
         # File path if available
         if file_path:
             triples.append(RDFTriple(
                 doc_uri,
-                "slop:filePath", 
+                SLOP_FILE_PATH, 
                 str(file_path),
                 object_type="literal"
             ))
@@ -227,18 +319,22 @@ class OntologyMapper:
         """Create RDF triples for extracted concepts"""
         triples = []
         concept_uris = []
+        uris_by_key: Dict[Tuple[str, str], str] = {}  # Repeated mentions hash once
         
         for concept in concepts:
             # Generate concept URI
-            concept_id = hashlib.sha256(f"{concept.text}_{concept.label}".encode()).hexdigest()[:8]
-            concept_uri = f"{self.namespaces['slop']}concept/{concept_id}"
+            key = (concept.text, concept.label)
+            concept_uri = uris_by_key.get(key)
+            if concept_uri is None:
+                concept_id = hashlib.sha256(f"{concept.text}_{concept.label}".encode()).digest()[:4].hex()
+                concept_uri = uris_by_key[key] = self._concept_prefix + concept_id
             concept_uris.append(concept_uri)
             
             # Basic concept type
             triples.append(RDFTriple(
                 concept_uri,
-                "rdf:type",
-                "slop:Concept"
+                RDF_TYPE,
+                SLOP_CONCEPT
             ))
             
             # Map to standard ontology
@@ -246,14 +342,14 @@ class OntologyMapper:
                 ontology_type = self.concept_mappings[concept.label]
                 triples.append(RDFTriple(
                     concept_uri,
-                    "rdf:type",
+                    RDF_TYPE,
                     ontology_type
                 ))
             
             # Concept text
             triples.append(RDFTriple(
                 concept_uri,
-                "rdfs:label",
+                RDFS_LABEL,
                 concept.text,
                 object_type="literal"
             ))
@@ -261,7 +357,7 @@ class OntologyMapper:
             # GLiNER label
             triples.append(RDFTriple(
                 concept_uri,
-                "slop:glinerLabel",
+                SLOP_GLINER_LABEL,
                 concept.label,
                 object_type="literal"
             ))
@@ -269,33 +365,33 @@ class OntologyMapper:
             # Confidence score
             triples.append(RDFTriple(
                 concept_uri,
-                "slop:confidence",
+                SLOP_CONFIDENCE,
                 str(concept.confidence),
                 object_type="typed_literal",
-                datatype="http://www.w3.org/2001/XMLSchema#float"
+                datatype=XSD_FLOAT
             ))
             
             # Position in text
             triples.append(RDFTriple(
                 concept_uri,
-                "slop:startPosition",
+                SLOP_START_POSITION,
                 str(concept.start),
                 object_type="typed_literal",
-                datatype="http://www.w3.org/2001/XMLSchema#integer"
+                datatype=XSD_INTEGER
             ))
             
             triples.append(RDFTriple(
                 concept_uri,
-                "slop:endPosition", 
+                SLOP_END_POSITION, 
                 str(concept.end),
                 object_type="typed_literal",
-                datatype="http://www.w3.org/2001/XMLSchema#integer"
+                datatype=XSD_INTEGER
             ))
             
             # Context
             triples.append(RDFTriple(
                 concept_uri,
-                "slop:context",
+                SLOP_CONTEXT,
                 concept.context,
                 object_type="literal"
             ))
@@ -303,7 +399,7 @@ class OntologyMapper:
             # Link concept to document
             triples.append(RDFTriple(
                 doc_uri,
-                "slop:discusses",
+                SLOP_DISCUSSES,
                 concept_uri
             ))
         
@@ -318,17 +414,14 @@ class OntologyMapper:
         """Create relationship triples between concepts"""
         triples = []
         
-        # Co-occurrence relationships
-        for i, concept_a in enumerate(concepts):
-            for j, concept_b in enumerate(concepts[i+1:], i+1):
-                # Check if concepts are nearby (within 100 characters)
-                distance = abs(concept_a.start - concept_b.start)
-                if distance < 100:
-                    triples.append(RDFTriple(
-                        concept_uris[i],
-                        "slop:coOccursWith",
-                        concept_uris[j]
-                    ))
+        # Co-occurrence relationships between nearby concepts
+        starts = [concept.start for concept in concepts]
+        for i, j in _cooccurrence_pairs(starts, CO_OCCURRENCE_WINDOW):
+            triples.append(RDFTriple(
+                concept_uris[i],
+                SLOP_CO_OCCURS_WITH,
+                concept_uris[j]
+            ))
         
         return triples
     
@@ -347,81 +440,133 @@ class OntologyMapper:
                 percentage = count / total_concepts
                 
                 # Domain coverage
+                covers = self._domain_predicates.get(domain)
+                if covers is None:
+                    covers = self._domain_predicates[domain] = sys.intern(f"slop:covers{domain.title()}")
                 triples.append(RDFTriple(
                     doc_uri,
-                    f"slop:covers{domain.title()}",
+                    covers,
                     str(percentage),
                     object_type="typed_literal",
-                    datatype="http://www.w3.org/2001/XMLSchema#float"
+                    datatype=XSD_FLOAT
                 ))
                 
                 # Primary domain if > 50%
                 if percentage > 0.5:
                     triples.append(RDFTriple(
                         doc_uri,
-                        "slop:primaryDomain",
+                        SLOP_PRIMARY_DOMAIN,
                         domain,
                         object_type="literal"
                     ))
         
         return triples
 
+def _cooccurrence_pairs(starts: List[int], window: int) -> List[Tuple[int, int]]:
+    """
+    Find index pairs (i < j) whose start positions are less than window apart.
+    Sweeps the positions in sorted order so each one is only compared with
+    its neighbours inside the window, then returns pairs in (i, j) order.
+    """
+    if len(starts) >= NUMBA_COOCCURRENCE_THRESHOLD:
+        kernel = _get_cooccurrence_kernel()
+        if kernel is not None:
+            positions = np.asarray(starts, dtype=np.int64)
+            order = np.argsort(positions, kind="stable")
+            pairs = kernel(order, positions[order], window)
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            return list(map(tuple, pairs.tolist()))
+    
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+    n = len(order)
+    pairs = []
+    
+    for a in range(n):
+        i = order[a]
+        limit = starts[i] + window
+        b = a + 1
+        while b < n and starts[order[b]] < limit:
+            j = order[b]
+            pairs.append((i, j) if i < j else (j, i))
+            b += 1
+    
+    pairs.sort()
+    return pairs
+
 def serialize_triples_turtle(mapping: SemanticMapping) -> str:
     """Serialize RDF triples to Turtle format"""
-    lines = []
+    buf = io.StringIO()
+    write_triples_turtle(mapping, buf)
+    return buf.getvalue()
+
+def write_triples_turtle(mapping: SemanticMapping, out: TextIO) -> None:
+    """Write RDF triples as Turtle to a text stream, e.g. an open file"""
+    write = out.write
     
     # Add namespace prefixes
     for prefix, uri in mapping.namespaces.items():
-        lines.append(f"@prefix {prefix}: <{uri}> .")
-    lines.append("")
+        write(f"@prefix {prefix}: <{uri}> .\n")
+    prefixed = _PrefixCache(mapping.namespaces)
     
     # Group triples by subject
-    subjects = {}
+    subjects = defaultdict(list)
     for triple in mapping.triples:
-        if triple.subject not in subjects:
-            subjects[triple.subject] = []
         subjects[triple.subject].append(triple)
     
-    # Serialize each subject
+    # Serialize each subject, written straight to the stream
     for subject, triples in subjects.items():
         # Use prefixed form if possible
-        subject_str = _use_prefix(subject, mapping.namespaces)
-        lines.append(f"{subject_str}")
+        write("\n")
+        write(prefixed[subject])
+        write("\n")
         
+        last = len(triples) - 1
         for i, triple in enumerate(triples):
-            predicate = _use_prefix(triple.predicate, mapping.namespaces)
-            object_str = _format_object(triple, mapping.namespaces)
+            write("    " if i == 0 else "    ;")
+            write(prefixed[triple.predicate])
             
-            connector = "    " if i == 0 else "    ;"
-            terminator = " ;" if i < len(triples) - 1 else " ."
+            # Object, dispatched inline on its type
+            object_type = triple.object_type
+            if object_type == "uri":
+                write(" ")
+                write(prefixed[triple.object])
+            elif object_type == "literal":
+                write(' "')
+                write(triple.object.translate(LITERAL_ESCAPES))
+                write('"')
+            elif object_type == "typed_literal":
+                write(' "')
+                write(triple.object.translate(LITERAL_ESCAPES))
+                write('"^^')
+                write(prefixed[triple.datatype])
+            else:
+                write(" ")
+                write(triple.object)
             
-            lines.append(f"{connector}{predicate} {object_str}{terminator}")
-        lines.append("")
-    
-    return "\n".join(lines)
+            write(" ;\n" if i < last else " .\n")
 
-def _use_prefix(uri: str, namespaces: Dict[str, str]) -> str:
+def _prefix_table(namespaces: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """Order (prefix, namespace) pairs longest namespace first, so the most specific one matches"""
+    return tuple(sorted(namespaces.items(), key=lambda item: -len(item[1])))
+
+def _use_prefix(uri: str, prefixes: Tuple[Tuple[str, str], ...]) -> str:
     """Convert full URI to prefixed form if possible"""
-    for prefix, namespace in namespaces.items():
+    for prefix, namespace in prefixes:
         if uri.startswith(namespace):
             local_name = uri[len(namespace):]
             return f"{prefix}:{local_name}"
     return f"<{uri}>"
 
-def _format_object(triple: RDFTriple, namespaces: Dict[str, str]) -> str:
-    """Format the object part of an RDF triple"""
-    if triple.object_type == "uri":
-        return _use_prefix(triple.object, namespaces)
-    elif triple.object_type == "literal":
-        # Escape quotes in literals
-        escaped = triple.object.replace('"', '\\"')
-        return f'"{escaped}"'
-    elif triple.object_type == "typed_literal":
-        escaped = triple.object.replace('"', '\\"')
-        datatype = _use_prefix(triple.datatype, namespaces)
-        return f'"{escaped}"^^{datatype}'
-    else:
-        return triple.object
+class _PrefixCache(dict):
+    """Memoizes _use_prefix per URI; predicates and datatypes repeat on nearly every triple"""
+    
+    def __init__(self, namespaces: Dict[str, str]):
+        super().__init__()
+        self.prefixes = _prefix_table(namespaces)
+    
+    def __missing__(self, uri: str) -> str:
+        result = self[uri] = _use_prefix(uri, self.prefixes)
+        return result
 
 if __name__ == "__main__":
     # Test ontology mapping
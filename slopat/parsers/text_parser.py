@@ -6,6 +6,11 @@ from pathlib import Path
 from dataclasses import dataclass
 from enum import Enum
 
+# Long documents are first classified from this many lines at each end
+SAMPLE_LINES = 100
+# A pattern group matching more than this share of the sampled lines decides the type
+SAMPLE_CONFIDENCE = 0.4
+
 class DocumentType(Enum):
     CONVERSATION = "conversation"
     MARKDOWN = "markdown"
@@ -49,6 +54,18 @@ class TextParser:
             r'^-{3,}',  # Horizontal rules
             r'^\|',  # Tables
         ]
+        
+        # Each group is compiled once into a single alternation, so a line is
+        # tested against the whole group in one regex call. MULTILINE lets ^
+        # match at a line start when searching inside the full content.
+        self._conv_re = self._compile_group(self.conversation_patterns)
+        self._md_re = self._compile_group(self.markdown_patterns)
+        self._struct_re = self._compile_group(self.structured_patterns)
+    
+    @staticmethod
+    def _compile_group(patterns: List[str]) -> re.Pattern:
+        """Compile patterns into one regex matching wherever any of them would"""
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.MULTILINE)
     
     def classify_document(self, content: str) -> DocumentMetadata:
         """Alias for detect_document_type to match main.py interface"""
@@ -59,21 +76,71 @@ class TextParser:
         Detect the type of document based on content patterns.
         Similar to how we detect function types in CodeDoc AST parsing.
         """
-        lines = content.strip().split('\n')
-        total_lines = len(lines)
+        content = content.strip()
+        total_lines = content.count('\n') + 1
         
         if total_lines == 0:
             return DocumentMetadata(DocumentType.RANDOM, 0.0, {})
         
-        # Count pattern matches
-        conversation_score = self._count_patterns(lines, self.conversation_patterns)
-        markdown_score = self._count_patterns(lines, self.markdown_patterns)
-        structured_score = self._count_patterns(lines, self.structured_patterns)
+        if total_lines > 2 * SAMPLE_LINES:
+            # Long document: classify from its first and last lines, and only
+            # scan the middle when that sample is ambiguous
+            head_end = -1
+            for _ in range(SAMPLE_LINES):
+                head_end = content.find('\n', head_end + 1)
+            tail_start = len(content)
+            for _ in range(SAMPLE_LINES):
+                tail_start = content.rfind('\n', 0, tail_start)
+            
+            head = self._scan_lines(content, 0, head_end)
+            tail = self._scan_lines(content, tail_start + 1, len(content))
+            conversation_score = head[0] + tail[0]
+            markdown_score = head[1] + tail[1]
+            structured_score = head[2] + tail[2]
+            scanned_lines = 2 * SAMPLE_LINES
+            
+            if max(conversation_score, markdown_score, structured_score) <= SAMPLE_CONFIDENCE * scanned_lines:
+                middle = self._scan_lines(content, head_end + 1, tail_start)
+                conversation_score += middle[0]
+                markdown_score += middle[1]
+                structured_score += middle[2]
+                scanned_lines = total_lines
+        else:
+            conversation_score, markdown_score, structured_score = self._scan_lines(content, 0, len(content))
+            scanned_lines = total_lines
+        
+        # Whole-document line features come straight from content
+        total_length = len(content) - (total_lines - 1)  # Excluding newlines
+        has_headers = content.startswith('#') or '\n#' in content
+        
+        # Speaker markers and title candidates only look at the first few lines
+        has_speakers = False
+        header_line = None  # First markdown header
+        prose_line = None  # First substantial line without a speaker colon
+        first_line = None  # First substantial line
+        start = 0
+        for i in range(min(total_lines, 10)):
+            end = content.find('\n', start)
+            if end == -1:
+                end = len(content)
+            if not has_speakers and content.find(':', start, min(start + 50, end)) != -1:
+                has_speakers = True
+            if i < 5:
+                line = content[start:end]
+                if header_line is None and line.startswith('#'):
+                    header_line = line
+                stripped = line.strip()
+                if len(stripped) > 10:
+                    if first_line is None and i < 3:
+                        first_line = stripped
+                    if prose_line is None and ':' not in line[:50]:
+                        prose_line = stripped
+            start = end + 1
         
         # Calculate confidence scores
-        conv_confidence = conversation_score / total_lines
-        md_confidence = markdown_score / total_lines  
-        struct_confidence = structured_score / total_lines
+        conv_confidence = conversation_score / scanned_lines
+        md_confidence = markdown_score / scanned_lines
+        struct_confidence = structured_score / scanned_lines
         
         # Determine type based on highest confidence
         scores = [
@@ -92,52 +159,71 @@ class TextParser:
         # Extract features for downstream processing
         features = {
             'line_count': total_lines,
-            'avg_line_length': sum(len(line) for line in lines) / total_lines,
+            'avg_line_length': total_length / total_lines,
             'conversation_markers': conversation_score,
             'markdown_markers': markdown_score,
             'structured_markers': structured_score,
-            'has_headers': any(line.startswith('#') for line in lines),
-            'has_speakers': any(':' in line[:50] for line in lines[:10]),
+            'scanned_lines': scanned_lines,
+            'has_headers': has_headers,
+            'has_speakers': has_speakers,
         }
         
         # Generate suggested title
-        title = self._extract_title(lines, doc_type)
+        title = self._extract_title(doc_type, header_line, prose_line, first_line)
         
         return DocumentMetadata(doc_type, confidence, features, title)
     
-    def _count_patterns(self, lines: List[str], patterns: List[str]) -> int:
-        """Count how many lines match any of the given patterns."""
-        count = 0
-        for line in lines:
-            if any(re.search(pattern, line) for pattern in patterns):
-                count += 1
-        return count
+    def _scan_lines(self, content: str, start: int, stop: int) -> Tuple[int, int, int]:
+        """
+        Count lines in content[start:stop] matching each pattern group.
+        Lines are never split out: each one is searched in place as the
+        content[start:end] window, which also keeps matches from crossing newlines.
+        Returns (conversation, markdown, structured).
+        """
+        conversation_score = markdown_score = structured_score = 0
+        conv_re, md_re, struct_re = self._conv_re, self._md_re, self._struct_re
+        while True:
+            end = content.find('\n', start, stop)
+            if end == -1:
+                end = stop
+            if conv_re.search(content, start, end):
+                conversation_score += 1
+            if md_re.search(content, start, end):
+                markdown_score += 1
+            if struct_re.search(content, start, end):
+                structured_score += 1
+            if end >= stop:
+                break
+            start = end + 1
+        return conversation_score, markdown_score, structured_score
     
-    def _extract_title(self, lines: List[str], doc_type: DocumentType) -> Optional[str]:
-        """Extract a suggested title based on document type."""
-        if not lines:
-            return None
-            
-        # For markdown, look for first header
-        if doc_type == DocumentType.MARKDOWN:
-            for line in lines[:5]:
-                if line.startswith('#'):
-                    return line.lstrip('#').strip()
+    def _extract_title(
+        self,
+        doc_type: DocumentType,
+        header_line: Optional[str],
+        prose_line: Optional[str],
+        first_line: Optional[str]
+    ) -> Optional[str]:
+        """Pick a suggested title from the head-line candidates based on document type."""
+        # For markdown, use the first header
+        if doc_type == DocumentType.MARKDOWN and header_line is not None:
+            return header_line.lstrip('#').strip()
         
         # For conversations, use first few words of first substantial line
-        if doc_type == DocumentType.CONVERSATION:
-            for line in lines[:5]:
-                if len(line.strip()) > 10 and ':' not in line[:50]:
-                    words = line.strip().split()[:6]
-                    return ' '.join(words) + ('...' if len(words) == 6 else '')
+        if doc_type == DocumentType.CONVERSATION and prose_line is not None:
+            return self._title_from_line(prose_line)
         
         # Default: first substantial line
-        for line in lines[:3]:
-            if len(line.strip()) > 10:
-                words = line.strip().split()[:6]
-                return ' '.join(words) + ('...' if len(words) == 6 else '')
+        if first_line is not None:
+            return self._title_from_line(first_line)
         
         return None
+    
+    @staticmethod
+    def _title_from_line(line: str) -> str:
+        """First six words of a line, with an ellipsis if it may go on"""
+        words = line.split()[:6]
+        return ' '.join(words) + ('...' if len(words) == 6 else '')
 
 def parse_text_file(file_path: Path) -> Tuple[str, DocumentMetadata]:
     """
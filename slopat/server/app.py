@@ -1,29 +1,50 @@
 """FastAPI web server for slop.at"""
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, List, Tuple
+import asyncio
+import heapq
+import json
 import logging
+import mmap
+import orjson
+import os
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from functools import partial
 
-from ..main import SlopProcessor
+from ..main import SLOPS_DIR, get_processor
 from ..parsers.gliner_extractor import ConceptExtractionResult
 from ..parsers.text_parser import DocumentMetadata
 from ..parsers.ontology_mapper import SemanticMapping
+from ..web.html_generator import CONCEPTS_SCRIPT_OPEN
+from .slop_files import parse_slop_title, is_slop_entry, count_slops
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, which walks the payload in C and yields bytes directly"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 # Create FastAPI app
 app = FastAPI(
     title="slop.at",
     description="Semantic web publishing platform - SLOP first, optimize later!",
-    version="0.0.1"
+    version="0.0.1",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow frontend access
@@ -35,14 +56,143 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize processor
-SLOPS_DIR = Path.home() / ".slopat" / "slops"
-SLOPS_DIR.mkdir(parents=True, exist_ok=True)
+# Shared processor; the web server opens the store read-only
+processor = get_processor(read_only=True)
+
+# Submissions run GLiNER inference here, off the event loop, so page and API requests keep flowing.
+# One worker: the shared SlopProcessor (lazy model load, LRU caches) isn't thread-safe
+SUBMIT_WORKERS = 1
+_infer_pool = ThreadPoolExecutor(max_workers=SUBMIT_WORKERS, thread_name_prefix="slop-submit")
+
+# Slop ids as produced by HTMLGenerator._generate_url_path; no dots or slashes
+SLOP_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
 
-# Initialize store in read-only mode for web server
-from ..graph.store import SlopStore
-read_only_store = SlopStore(read_only=True)
-processor = SlopProcessor(output_dir=SLOPS_DIR, store=read_only_store)
+# Any slop id can be republished with different HTML (hashed ids only cover the input
+# markdown, not the model or generator), so clients always revalidate against the ETag
+SLOP_CACHE_CONTROL = 'no-cache'
+
+# Patterns over generated slop HTML, compiled once
+CONCEPT_SPAN_PATTERN = re.compile(rb'<span class="concept-[^"]+"')
+CONCEPT_ATTRS_PATTERN = re.compile(rb'<span class="(concept-[^"]+)" data-concept="([^"]+)" data-domain="([^"]+)" data-confidence="([^"]+)" data-link-id="([^"]+)"')
+MAIN_CONTENT_PATTERN = re.compile(rb'<main class="main-content">(.*?)</main>', re.DOTALL)
+
+# Listing metadata per slop file name, reused until the file's mtime or size changes.
+# Scans run in worker threads; entries are only ever replaced whole, so overlapping scans are safe.
+_slop_meta_cache: Dict[str, Tuple[Tuple[int, int], Optional[dict]]] = {}
+
+CONCEPTS_SCRIPT_OPEN_BYTES = CONCEPTS_SCRIPT_OPEN.encode()
+
+def _embedded_concepts(page, after: int = 0) -> Optional[List[dict]]:
+    """
+    Concepts from the page's embedded JSON block, or None for pages generated without one.
+    The block follows the main content, which may quote the marker itself, so only
+    the last occurrence past `after` counts.
+    """
+    start = page.rfind(CONCEPTS_SCRIPT_OPEN_BYTES, after)
+    if start == -1:
+        return None
+    start += len(CONCEPTS_SCRIPT_OPEN_BYTES)
+    end = page.find(b'</script>', start)
+    return json.loads(page[start:end])
+
+def _read_slop_json(path: Path) -> dict:
+    """
+    Pull the title, main content and concepts out of a slop page.
+    The page is searched through a memory map; only the parts returned are decoded.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        page_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else nullcontext(b'')
+        with page_map as page:
+            title = parse_slop_title(page, "Untitled")
+            
+            # Extract just the main content (between <main> tags)
+            main_match = MAIN_CONTENT_PATTERN.search(page)
+            content_html = (main_match.group(1) if main_match else page[:]).decode('utf-8')
+            
+            # Concepts come from the embedded JSON block; older pages are scanned span by span
+            concepts = _embedded_concepts(page, main_match.end() if main_match else 0)
+            if concepts is None:
+                concepts = []
+                for match in CONCEPT_ATTRS_PATTERN.finditer(page):
+                    css_class, text, domain, confidence, link_id = match.groups()
+                    concepts.append({
+                        'text': text.decode('utf-8'),
+                        'domain': domain.decode('utf-8'),
+                        'confidence': float(confidence),
+                        'linkId': link_id.decode('utf-8')
+                    })
+    
+    return {
+        'title': title,
+        'html': content_html,  # Just the main content HTML fragment
+        'concepts': concepts
+    }
+
+def _slop_cache_headers(hash_id: str, stat_result: os.stat_result) -> Dict[str, str]:
+    """ETag and Cache-Control for a slop, tied to the file's mtime and size"""
+    etag = f'"{hash_id}-{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    return {'ETag': etag, 'Cache-Control': SLOP_CACHE_CONTROL}
+
+def _not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """Whether the client's If-None-Match already names this ETag"""
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    return any(tag.strip() in (headers['ETag'], '*') for tag in if_none_match.split(','))
+
+def _read_slop_meta(path: str, hash_id: str) -> dict:
+    """Read a slop's title and concept count from its HTML, without decoding the whole page"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    
+    title = parse_slop_title(content, hash_id)
+    
+    concepts_count = len(CONCEPT_SPAN_PATTERN.findall(content))
+    
+    return {'title': title, 'concepts_count': concepts_count}
+
+def _scan_slops(limit: Optional[int] = None) -> Tuple[List[dict], int]:
+    """
+    List slops newest first with their title and concept count, plus the total
+    number of slops. With a limit only that many of the newest are returned,
+    picked by partial sort, and only files that are new or changed since the
+    last scan are read. title and concepts_count are None for unreadable files.
+    """
+    found = []
+    with os.scandir(SLOPS_DIR) as entries:
+        for entry in entries:
+            if is_slop_entry(entry):
+                found.append((entry.stat(), entry.name, entry.path))
+    
+    # Forget files that have been removed
+    for name in _slop_meta_cache.keys() - {name for _, name, _ in found}:
+        _slop_meta_cache.pop(name, None)
+    
+    by_mtime = lambda item: item[0].st_mtime
+    if limit is None:
+        newest = sorted(found, key=by_mtime, reverse=True)
+    else:
+        newest = heapq.nlargest(limit, found, key=by_mtime)
+    
+    slops = []
+    for stat, name, path in newest:
+        hash_id = name[:-5]
+        key = (stat.st_mtime_ns, stat.st_size)
+        
+        cached = _slop_meta_cache.get(name)
+        if cached is None or cached[0] != key:
+            try:
+                meta = _read_slop_meta(path, hash_id)
+            except Exception as e:
+                logger.warning(f"Error reading slop {hash_id}: {e}")
+                meta = None
+            cached = _slop_meta_cache[name] = (key, meta)
+        
+        meta = cached[1] or {'title': None, 'concepts_count': None}
+        slops.append({'hash': hash_id, 'modified': stat.st_mtime, **meta})
+    
+    return slops, len(found)
 
 # Request/Response models
 class SlopSubmission(BaseModel):
@@ -57,118 +207,92 @@ class SlopResponse(BaseModel):
     concepts_count: int
     message: str
 
-# Routes
-@app.get("/", response_class=HTMLResponse)
-async def index():
-    """Index page listing all slops"""
-    slop_files = sorted(SLOPS_DIR.glob("*.html"), key=lambda x: x.stat().st_mtime, reverse=True)
-
-    slops_list = []
-    for slop_file in slop_files[:50]:  # Show latest 50
-        # Extract hash from filename
-        hash_id = slop_file.stem
-        # Read first line as title (hack for now)
-        try:
-            with open(slop_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-                # Extract title from HTML
-                title_start = content.find('<title>') + 7
-                title_end = content.find(' - slop.at</title>')
-                title = content[title_start:title_end] if title_start > 6 else hash_id
-        except Exception:
-            title = hash_id
+# Related-slop lookups per (concept, limit). Other processes write to the store,
+# so entries also expire after a TTL rather than waiting for an invalidation.
+RELATED_CACHE_SIZE = 1024
+RELATED_CACHE_TTL = 60.0  # seconds
+_related_cache: OrderedDict = OrderedDict()
 
-        slops_list.append({
-            'hash': hash_id,
-            'title': title,
-            'url': f'/{hash_id}'
-        })
-
-    # Generate simple index HTML
-    slops_html = "\n".join([
-        f'<li><a href="{s["url"]}" class="slop-link">{s["title"]}</a> <span class="hash">({s["hash"]})</span></li>'
-        for s in slops_list
-    ])
-
-    html = f"""<!DOCTYPE html>
+# Static parts of the index page, encoded once
+INDEX_HEAD = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>slop.at - Semantic Web Publishing</title>
     <style>
-        body {{
+        body {
             margin: 0;
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             min-height: 100vh;
             padding: 2rem;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 800px;
             margin: 0 auto;
-        }}
-        h1 {{
+        }
+        h1 {
             font-size: 3rem;
             margin-bottom: 0.5rem;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
-        .tagline {{
+        }
+        .tagline {
             font-size: 1.2rem;
             opacity: 0.9;
             margin-bottom: 3rem;
-        }}
-        .slops-list {{
+        }
+        .slops-list {
             background: white;
             border-radius: 12px;
             padding: 2rem;
             box-shadow: 0 10px 30px rgba(0,0,0,0.3);
-        }}
-        .slops-list h2 {{
+        }
+        .slops-list h2 {
             color: #333;
             margin-top: 0;
             margin-bottom: 1.5rem;
-        }}
-        .slops-list ul {{
+        }
+        .slops-list ul {
             list-style: none;
             padding: 0;
             margin: 0;
-        }}
-        .slops-list li {{
+        }
+        .slops-list li {
             padding: 1rem;
             border-bottom: 1px solid #e5e7eb;
-        }}
-        .slops-list li:last-child {{
+        }
+        .slops-list li:last-child {
             border-bottom: none;
-        }}
-        .slop-link {{
+        }
+        .slop-link {
             color: #667eea;
             text-decoration: none;
             font-weight: 600;
             font-size: 1.1rem;
-        }}
-        .slop-link:hover {{
+        }
+        .slop-link:hover {
             text-decoration: underline;
-        }}
-        .hash {{
+        }
+        .hash {
             color: #6b7280;
             font-size: 0.85rem;
             font-family: monospace;
-        }}
-        .stats {{
+        }
+        .stats {
             color: #333;
             margin-top: 2rem;
             padding-top: 1rem;
             border-top: 2px solid #e5e7eb;
             font-size: 0.9rem;
-        }}
-        .empty-state {{
+        }
+        .empty-state {
             color: #6b7280;
             text-align: center;
             padding: 3rem;
             font-style: italic;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -178,13 +302,41 @@ async def index():
 
         <div class="slops-list">
             <h2>📚 Recent Slops</h2>
-            {"<ul>" + slops_html + "</ul>" if slops_list else '<div class="empty-state">No slops yet! Submit your first one via the API or MCP server.</div>'}
-            {"<div class='stats'>Total slops: " + str(len(slop_files)) + "</div>" if slop_files else ""}
+            """.encode()
+INDEX_EMPTY = '<div class="empty-state">No slops yet! Submit your first one via the API or MCP server.</div>'.encode()
+INDEX_TAIL = """
         </div>
     </div>
 </body>
-</html>"""
+</html>""".encode()
+
+# Routes
+@app.get("/", response_class=HTMLResponse)
+async def index():
+    """Index page listing all slops"""
+    latest, total_slops = await asyncio.to_thread(_scan_slops, 50)  # Show latest 50
+
+    slops_list = []
+    for slop in latest:
+        hash_id = slop['hash']
+        slops_list.append({
+            'hash': hash_id,
+            'title': slop['title'] if slop['title'] is not None else hash_id,
+            'url': f'/{hash_id}'
+        })
+
+    # Generate simple index HTML around the prebuilt shell
+    if latest:
+        items = "\n".join(
+            f'<li><a href="{s["url"]}" class="slop-link">{s["title"]}</a> <span class="hash">({s["hash"]})</span></li>'
+            for s in slops_list
+        )
+        listing = b"<ul>" + items.encode() + b"</ul>"
+    else:
+        listing = INDEX_EMPTY
+    stats = f"<div class='stats'>Total slops: {total_slops}</div>" if total_slops else ""
 
+    html = b"".join((INDEX_HEAD, listing, b"\n            ", stats.encode(), INDEX_TAIL))
     return HTMLResponse(content=html)
 
 @app.post("/slop", response_model=SlopResponse)
@@ -196,16 +348,16 @@ async def submit_slop(submission: SlopSubmission):
         logger.info(f"Processing new slop submission (length: {len(submission.markdown)} chars)")
 
         # Process the markdown through the pipeline
-        result = processor.process_content(
-            submission.markdown,
-            file_path=None,
-            store_in_graph=True
+        result = await asyncio.get_running_loop().run_in_executor(
+            _infer_pool,
+            partial(processor.process_content, submission.markdown, file_path=None, store_in_graph=True)
         )
 
         # Extract hash from URL path
         hash_id = result.slop_page.url_path.lstrip('/')
 
         logger.info(f"Successfully created slop: {hash_id}")
+        _related_cache.clear()
 
         return SlopResponse(
             success=True,
@@ -221,62 +373,49 @@ async def submit_slop(submission: SlopSubmission):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/{hash_id}", response_class=HTMLResponse)
-async def get_slop(hash_id: str):
+async def get_slop(hash_id: str, request: Request):
     """
     Retrieve a slop by its hash
     """
-    # Clean hash_id to prevent directory traversal
-    hash_id = hash_id.replace('/', '').replace('..', '')
+    # Only accept well-formed ids, so the path can't escape SLOPS_DIR
+    if not SLOP_ID_PATTERN.fullmatch(hash_id):
+        raise HTTPException(status_code=404, detail=f"Slop '{hash_id}' not found")
 
     slop_path = SLOPS_DIR / f"{hash_id}.html"
 
-    if not slop_path.exists():
+    try:
+        stat_result = slop_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Slop '{hash_id}' not found")
 
-    try:
-        with open(slop_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return HTMLResponse(content=content)
-    except Exception as e:
-        logger.error(f"Error reading slop {hash_id}: {e}")
-        raise HTTPException(status_code=500, detail="Error reading slop")
+    headers = _slop_cache_headers(hash_id, stat_result)
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    # Sent straight from disk, without decoding and re-encoding the page
+    return FileResponse(slop_path, headers=headers, media_type="text/html; charset=utf-8",
+                        stat_result=stat_result)
 
 @app.get("/api/slops")
 async def list_slops():
     """List all slops for the frontend"""
     try:
-        slop_files = sorted(SLOPS_DIR.glob("*.html"), key=lambda x: x.stat().st_mtime, reverse=True)
-
         slops_list = []
-        for slop_file in slop_files:
-            hash_id = slop_file.stem
+        slops, _ = await asyncio.to_thread(_scan_slops)
+        for slop in slops:
+            if slop['title'] is None:
+                continue  # Unreadable, already logged
 
-            try:
-                with open(slop_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Extract title
-                title_start = content.find('<title>') + 7
-                title_end = content.find(' - slop.at</title>')
-                title = content[title_start:title_end] if title_start > 6 else hash_id
-
-                # Count concepts
-                import re
-                concept_pattern = r'<span class="concept-[^"]+"'
-                concepts_count = len(re.findall(concept_pattern, content))
-
-                slops_list.append({
-                    'hash': hash_id,
-                    'title': title,
-                    'url': f'/{hash_id}',
-                    'concepts_count': concepts_count,
-                    'modified': slop_file.stat().st_mtime
-                })
-            except Exception as e:
-                logger.warning(f"Error reading slop {hash_id}: {e}")
-                continue
+            hash_id = slop['hash']
+            slops_list.append({
+                'hash': hash_id,
+                'title': slop['title'],
+                'url': f'/{hash_id}',
+                'concepts_count': slop['concepts_count'],
+                'modified': slop['modified']
+            })
 
-        return JSONResponse({
+        return ORJSONResponse({
             'slops': slops_list,
             'count': len(slops_list)
         })
@@ -288,62 +427,39 @@ async def list_slops():
 @app.get("/api/stats")
 async def get_stats():
     """Get slop.at statistics"""
-    stats = processor.get_statistics()
-    slop_files = list(SLOPS_DIR.glob("*.html"))
+    stats = await asyncio.to_thread(processor.get_statistics)
+    total_slops = await asyncio.to_thread(count_slops, SLOPS_DIR)
 
-    return JSONResponse({
-        "total_slops": len(slop_files),
+    return ORJSONResponse({
+        "total_slops": total_slops,
         "graph_stats": stats.get("graph_database", {}),
         "output_directory": str(SLOPS_DIR),
         "version": "0.0.1"
     })
 
 @app.get("/api/slops/{hash_id}")
-async def get_slop_json(hash_id: str):
+async def get_slop_json(hash_id: str, request: Request):
     """
     Get slop data as JSON for the frontend
     """
-    # Clean hash_id to prevent directory traversal
-    hash_id = hash_id.replace('/', '').replace('..', '')
+    # Only accept well-formed ids, so the path can't escape SLOPS_DIR
+    if not SLOP_ID_PATTERN.fullmatch(hash_id):
+        raise HTTPException(status_code=404, detail=f"Slop '{hash_id}' not found")
 
     slop_path = SLOPS_DIR / f"{hash_id}.html"
 
-    if not slop_path.exists():
+    try:
+        stat_result = slop_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Slop '{hash_id}' not found")
 
-    try:
-        with open(slop_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-
-        # Extract title from HTML
-        title_start = html_content.find('<title>') + 7
-        title_end = html_content.find(' - slop.at</title>')
-        title = html_content[title_start:title_end] if title_start > 6 else "Untitled"
-
-        # Extract just the main content (between <main> tags)
-        import re
-        main_pattern = r'<main class="main-content">(.*?)</main>'
-        main_match = re.search(main_pattern, html_content, re.DOTALL)
-        content_html = main_match.group(1) if main_match else html_content
-
-        # Extract concepts from the HTML
-        concepts = []
-        concept_pattern = r'<span class="(concept-[^"]+)" data-concept="([^"]+)" data-domain="([^"]+)" data-confidence="([^"]+)" data-link-id="([^"]+)"'
-        for match in re.finditer(concept_pattern, html_content):
-            css_class, text, domain, confidence, link_id = match.groups()
-            concepts.append({
-                'text': text,
-                'domain': domain,
-                'confidence': float(confidence),
-                'linkId': link_id
-            })
+    headers = _slop_cache_headers(hash_id, stat_result)
+    if _not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
 
-        return JSONResponse({
-            'hash': hash_id,
-            'title': title,
-            'html': content_html,  # Just the main content HTML fragment
-            'concepts': concepts
-        })
+    try:
+        page = await asyncio.to_thread(_read_slop_json, slop_path)
+        return ORJSONResponse({'hash': hash_id, **page}, headers=headers)
 
     except Exception as e:
         logger.error(f"Error reading slop {hash_id}: {e}")
@@ -358,7 +474,19 @@ async def get_related_slops(concept_text: str):
     try:
         # Query Oxigraph for documents that mention this concept
         # Use the store's built-in method
-        related_docs = processor.store.find_related_documents(concept_text, limit=20)
+        key = (concept_text, 20)
+        cached = _related_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < RELATED_CACHE_TTL:
+            _related_cache.move_to_end(key)
+            related_docs = cached[1]
+        else:
+            related_docs = await asyncio.to_thread(
+                processor.store.find_related_documents, concept_text, limit=20
+            )
+            _related_cache[key] = (time.monotonic(), related_docs)
+            _related_cache.move_to_end(key)
+            if len(_related_cache) > RELATED_CACHE_SIZE:
+                _related_cache.popitem(last=False)
 
         results = []
         for doc in related_docs:
@@ -377,7 +505,7 @@ async def get_related_slops(concept_text: str):
                 'domain': doc.get('domain')
             })
 
-        return JSONResponse({
+        return ORJSONResponse({
             'concept': concept_text,
             'related_slops': results,
             'count': len(results)
@@ -386,7 +514,7 @@ async def get_related_slops(concept_text: str):
     except Exception as e:
         logger.error(f"Error querying related slops for '{concept_text}': {e}")
         # Return empty results instead of error to avoid breaking frontend
-        return JSONResponse({
+        return ORJSONResponse({
             'concept': concept_text,
             'related_slops': [],
             'count': 0,
@@ -1,7 +1,13 @@
 """MCP server for slop.at - allows Claude Desktop to submit slops"""
 
 import asyncio
+import heapq
 import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
@@ -9,21 +15,31 @@ from mcp.server import Server
 from mcp.types import Tool, TextContent
 from mcp.server.stdio import stdio_server
 
-from ..main import SlopProcessor
+from ..main import SLOPS_DIR, get_processor
+from .slop_files import read_slop_title, is_slop_entry, count_slops
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize processor
-SLOPS_DIR = Path.home() / ".slopat" / "slops"
-SLOPS_DIR.mkdir(parents=True, exist_ok=True)
+# Shared processor, writable so submitted slops reach the graph
+processor = get_processor()
 
-processor = SlopProcessor(output_dir=SLOPS_DIR)
+# Submissions run GLiNER inference here, off the event loop, so other tool calls keep flowing.
+# One worker: the shared SlopProcessor (lazy model load, LRU caches) isn't thread-safe
+SUBMIT_WORKERS = 1
+_infer_pool = ThreadPoolExecutor(max_workers=SUBMIT_WORKERS, thread_name_prefix="slop-submit")
 
 # Create MCP server
 app = Server("slopat")
 
+def _title_or_hash(slop_file: Path) -> str:
+    """Title from the head of a slop's HTML, falling back to its hash"""
+    try:
+        return read_slop_title(slop_file, slop_file.stem)
+    except Exception:
+        return slop_file.stem
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available MCP tools"""
@@ -88,10 +104,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             logger.info(f"Processing slop submission via MCP (length: {len(markdown)} chars)")
 
             # Process the markdown
-            result = processor.process_content(
-                markdown,
-                file_path=None,
-                store_in_graph=True
+            result = await asyncio.get_running_loop().run_in_executor(
+                _infer_pool,
+                partial(processor.process_content, markdown, file_path=None, store_in_graph=True)
             )
 
             # Extract hash from URL path
@@ -108,15 +123,12 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 **Top Concepts:**
 """
             # Add top concepts by domain
-            concepts_by_domain = {}
+            concepts_by_domain = defaultdict(list)
             for concept in result.slop_page.concepts:
-                domain = concept.label
-                if domain not in concepts_by_domain:
-                    concepts_by_domain[domain] = []
-                concepts_by_domain[domain].append(concept)
+                concepts_by_domain[concept.label].append(concept)
 
-            for domain, concepts in list(concepts_by_domain.items())[:5]:
-                top_concepts = sorted(concepts, key=lambda x: x.confidence, reverse=True)[:3]
+            for domain, concepts in islice(concepts_by_domain.items(), 5):
+                top_concepts = heapq.nlargest(3, concepts, key=lambda x: x.confidence)
                 response += f"\n- **{domain}:** {', '.join([c.text for c in top_concepts])}"
 
             response += f"\n\n**Saved to:** {result.saved_path}"
@@ -136,8 +148,9 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         limit = arguments.get("limit", 20)
 
         try:
-            slop_files = sorted(SLOPS_DIR.glob("*.html"), key=lambda x: x.stat().st_mtime, reverse=True)
-            slop_files = slop_files[:limit]
+            with os.scandir(SLOPS_DIR) as entries:
+                all_files = [(entry.stat().st_mtime, Path(entry.path)) for entry in entries if is_slop_entry(entry)]
+            slop_files = [path for _, path in heapq.nlargest(limit, all_files, key=lambda item: item[0])]
 
             if not slop_files:
                 return [TextContent(
@@ -145,20 +158,15 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                     text="No slops found. Submit your first one with `submit_slop`!"
                 )]
 
-            response = f"📚 **Recent Slops** (showing {len(slop_files)} of {len(list(SLOPS_DIR.glob('*.html')))} total)\n\n"
+            response = f"📚 **Recent Slops** (showing {len(slop_files)} of {len(all_files)} total)\n\n"
 
-            for slop_file in slop_files:
-                hash_id = slop_file.stem
-                # Try to extract title from HTML
-                try:
-                    with open(slop_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        title_start = content.find('<title>') + 7
-                        title_end = content.find(' - slop.at</title>')
-                        title = content[title_start:title_end] if title_start > 6 else hash_id
-                except Exception:
-                    title = hash_id
+            # Read the titles concurrently; on slow storage this costs the slowest read, not the sum
+            titles = await asyncio.gather(*(
+                asyncio.to_thread(_title_or_hash, slop_file) for slop_file in slop_files
+            ))
 
+            for slop_file, title in zip(slop_files, titles):
+                hash_id = slop_file.stem
                 response += f"- **{title}** (`{hash_id}`)\n  URL: http://localhost:8000/{hash_id}\n\n"
 
             return [TextContent(type="text", text=response)]
@@ -173,11 +181,11 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     elif name == "get_slop_stats":
         try:
             stats = processor.get_statistics()
-            slop_files = list(SLOPS_DIR.glob("*.html"))
+            total_slops = count_slops(SLOPS_DIR)
 
             response = f"""📊 **slop.at Statistics**
 
-**Total Slops:** {len(slop_files)}
+**Total Slops:** {total_slops}
 **Output Directory:** {SLOPS_DIR}
 
 **Graph Database:**
@@ -0,0 +1,49 @@
+"""Helpers for reading published slop HTML files"""
+
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from ..web.index_generator import INDEX_PAGE_PATTERN
+
+# Generated pages put <title> near the top of <head>, well inside this many bytes
+TITLE_HEAD_BYTES = 2048
+
+# Title markup as written by HTMLGenerator: <title>{title} - slop.at</title>
+_TITLE_OPEN = b'<title>'
+_TITLE_CLOSE = b' - slop.at</title>'
+_TITLE_OPEN_LEN = len(_TITLE_OPEN)
+
+def is_slop_entry(entry: os.DirEntry) -> bool:
+    """Whether a directory entry is a published slop page: a visible *.html file that isn't an index page"""
+    name = entry.name
+    return (name.endswith('.html') and not name.startswith('.')
+            and not INDEX_PAGE_PATTERN.fullmatch(name) and entry.is_file())
+
+def count_slops(slops_dir: Union[str, Path]) -> int:
+    """Count published slops without building Path objects or sorting them"""
+    with os.scandir(slops_dir) as entries:
+        return sum(1 for entry in entries if is_slop_entry(entry))
+
+def parse_slop_title(html: bytes, default: Optional[str] = None) -> Optional[str]:
+    """Extract the page title from slop HTML bytes, or default if it isn't there"""
+    i = html.find(_TITLE_OPEN)
+    if i < 0:
+        return default
+    j = html.find(_TITLE_CLOSE, i)
+    if j < 0:
+        return default
+    return html[i + _TITLE_OPEN_LEN:j].decode('utf-8')
+
+def read_slop_title(path: Union[str, Path], default: str) -> str:
+    """
+    Read a slop's title without loading the whole page.
+    Only the head of the file is read unless the title runs past it.
+    """
+    with open(path, 'rb') as f:
+        head = f.read(TITLE_HEAD_BYTES)
+        title = parse_slop_title(head)
+        if title is None and len(head) == TITLE_HEAD_BYTES:
+            title = parse_slop_title(head + f.read())
+
+    return title if title is not None else default
@@ -1,341 +1,300 @@
 """Simplified HTML generation for markdown-focused slop.at"""
 
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from bisect import bisect_right
+from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter, itemgetter
 from pathlib import Path
 import hashlib
+import heapq
 import html
+import io
+import json
 import re
+import threading
 from urllib.parse import quote
 
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
 from ..parsers.gliner_extractor import ExtractedConcept, ConceptExtractionResult
 from ..parsers.text_parser import DocumentMetadata, DocumentType
 from ..parsers.ontology_mapper import SemanticMapping
 
-@dataclass
-class DocumentOutline:
-    """Document outline item"""
-    level: int
-    text: str
-    id: str
-    line_number: int
-
-@dataclass
-class SlopPage:
-    """A generated slop.at page"""
-    html_content: str
-    url_path: str
-    title: str
-    concepts: List[ExtractedConcept]
-    metadata: DocumentMetadata
-
-class HTMLGenerator:
-    """
-    Generate beautiful HTML pages with 3-column layout:
-    stacked left sidebars | content | outline
-    """
-    
-    def __init__(self, base_url: str = "https://slop.at"):
-        self.base_url = base_url
-        
-        # Domain color mappings for concept highlighting
-        self.domain_colors = {
-            "cs": "#3B82F6",           # Blue for Computer Science
-            "math": "#8B5CF6",         # Purple for Mathematics  
-            "social": "#10B981",       # Green for Social Science
-            "philosophy": "#F59E0B",   # Amber for Philosophy
-            "people": "#EF4444",       # Red for People
-            "entities": "#6B7280",     # Gray for Organizations
-            "references": "#EC4899",   # Pink for Papers/References
-            "findings": "#84CC16",     # Lime for Research Findings
-            "methods": "#06B6D4",      # Cyan for Methodologies
-            "tools": "#8B5A2B",       # Brown for Tools/Frameworks
-            "other": "#6B7280"         # Gray for Other
-        }
-        
-        # CSS classes for concept types
-        self.concept_classes = {
-            "cs": "concept-cs",
-            "math": "concept-math", 
-            "social": "concept-social",
-            "philosophy": "concept-philosophy",
-            "people": "concept-people",
-            "entities": "concept-entities",
-            "references": "concept-references",
-            "findings": "concept-findings",
-            "methods": "concept-methods",
-            "tools": "concept-tools",
-            "other": "concept-other"
-        }
-    
-    def generate_slop_page(
-        self,
-        content: str,
-        extraction_result: ConceptExtractionResult,
-        doc_metadata: DocumentMetadata,
-        semantic_mapping: SemanticMapping,
-        file_path: Optional[Path] = None
-    ) -> SlopPage:
-        """Generate a complete slop.at page with optimized 3-column layout"""
-
-        # Generate unique URL path
-        url_path = self._generate_url_path(content, file_path)
-
-        # Generate page title
-        title = self._generate_title(doc_metadata, file_path)
+# Page domain for each GLiNER concept label; anything else is "other"
+CONCEPT_LABEL_DOMAINS = {
+    "computer_science_concept": "cs", "algorithm": "cs", "data_structure": "cs",
+    "programming_language": "cs", "software_system": "cs", "distributed_system": "cs",
+    "machine_learning_concept": "cs", "mathematics_concept": "math", "mathematical_theorem": "math",
+    "statistical_method": "math", "mathematical_proof": "math", "equation": "math",
+    "social_science_concept": "social", "research_method": "social", "psychological_concept": "social",
+    "economic_concept": "social", "organizational_behavior": "social", "philosophical_concept": "philosophy",
+    "ethical_principle": "philosophy", "logical_argument": "philosophy", "epistemological_concept": "philosophy",
+    "person_mention": "people", "organization": "entities", "academic_paper": "references",
+    "research_finding": "findings", "methodology": "methods", "tool": "tools", "framework": "tools",
+}
 
-        # Create sidebar data
-        sidebar_data = self._generate_sidebar_data(extraction_result, semantic_mapping)
+# Highlighted concept spans, as read back out of a generated page
+CONCEPT_SPAN_PATTERN = re.compile(r'<span class="(concept-[^"]+)" data-concept="([^"]+)" data-domain="([^"]+)" data-confidence="([^"]+)" data-link-id="([^"]+)"')
 
-        # SIMPLIFIED FLOW:
-        # 1. Convert markdown to HTML first
-        processed_content, outline = self._process_content_by_type(content, doc_metadata.doc_type)
+# Characters replaced with '-' when a file name becomes a slop URL path
+URL_SLUG_PATTERN = re.compile(r'[^a-zA-Z0-9\-_]')
 
-        # 2. Highlight concepts in the HTML (text-based search, not positions)
-        highlighted_content = self._highlight_concepts_in_html(processed_content, extraction_result.concepts)
+# Opening tag of the JSON block listing a page's highlighted concepts
+CONCEPTS_SCRIPT_OPEN = '<script type="application/json" id="slop-concepts">'
 
-        # Generate complete HTML page
-        html_content = self._generate_complete_html(
-            highlighted_content,
-            title,
-            sidebar_data,
-            doc_metadata,
-            url_path,
-            outline
-        )
-
-        return SlopPage(
-            html_content=html_content,
-            url_path=url_path,
-            title=title,
-            concepts=extraction_result.concepts,
-            metadata=doc_metadata
-        )
-    
-    def _generate_url_path(self, content: str, file_path: Optional[Path] = None) -> str:
-        """Generate a unique URL path for the slop"""
-        if file_path:
-            base_name = file_path.stem
-            clean_name = re.sub(r'[^a-zA-Z0-9\-_]', '-', base_name)
-            return f"/{clean_name}"
-        else:
-            content_hash = hashlib.sha256(content.encode()).hexdigest()[:8]
-            return f"/slop-{content_hash}"
+class _WordCharClasses(dict):
+    """
+    str.translate table: 'w' for characters a word may span when expanding a concept
+    (letters, digits and '-'), ' ' for the rest. Filled in as characters are first seen.
+    """
     
-    def _expand_to_word_boundaries(self, content: str, start: int, end: int) -> Tuple[int, int]:
-        """Expand concept boundaries to include full words
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        char_class = self[code] = 'w' if char.isalnum() or char == '-' else ' '
+        return char_class
 
-        GLiNER often detects partial words, so we expand the span to word boundaries.
-        Avoids expanding into markdown syntax characters.
-        """
-        # Characters that should stop word boundary expansion (markdown syntax)
-        stop_chars = {'#', '*', '_', '`', '[', ']', '(', ')', '\n', '\r'}
+_WORD_CHAR_CLASSES = _WordCharClasses()
 
-        # Expand left to word boundary (but not past markdown syntax or newlines)
-        while start > 0:
-            prev_char = content[start - 1]
-            if prev_char in stop_chars or not (prev_char.isalnum() or prev_char in {' ', '-'}):
-                break
-            if prev_char == ' ':
-                # Don't include leading space
-                break
-            start -= 1
+# Compiled concept patterns kept across pages; re-generated pages repeat the same concept sets
+CONCEPT_PATTERN_CACHE_SIZE = 256
 
-        # Expand right to word boundary (but not past markdown syntax or newlines)
-        while end < len(content):
-            next_char = content[end]
-            if next_char in stop_chars or not (next_char.isalnum() or next_char in {' ', '-'}):
-                break
-            if next_char == ' ':
-                # Don't include trailing space
-                break
-            end += 1
-
-        return start, end
+# Markup per concept (text, label); the same concepts recur across pages
+CONCEPT_MARKUP_CACHE_SIZE = 8192
 
-    def _highlight_concepts(self, content: str, concepts: List[ExtractedConcept]) -> str:
-        """Apply concept highlighting to text content
+def _concept_link_id(text: str, label: str) -> str:
+    """Link id for a concept: 8 hex digits of a 4-byte BLAKE2b digest, plenty for ids within a page"""
+    concept_id = hashlib.blake2b(f"{text}_{label}".encode(), digest_size=4).hexdigest()
+    return f"concept-{concept_id}"
 
-        Expands concept boundaries to word boundaries to avoid partial word highlighting.
-        """
-        sorted_concepts = sorted(concepts, key=lambda x: x.start, reverse=True)
-        highlighted_content = content
+def _onclick_string(text: str) -> str:
+    """
+    Concept text as the body of a single-quoted JS string in an onclick attribute.
+    JS-escaped before HTML-escaped, since the browser decodes the attribute's entities before running it.
+    """
+    return html.escape(json.dumps(text, ensure_ascii=False)[1:-1].replace("'", "\\'"))
 
-        for concept in sorted_concepts:
-            # Expand to word boundaries
-            expanded_start, expanded_end = self._expand_to_word_boundaries(
-                content, concept.start, concept.end
-            )
+@lru_cache(maxsize=CONCEPT_MARKUP_CACHE_SIZE)
+def _concept_markup(text: str, label: str) -> Tuple[str, str, str, str]:
+    """(escaped text, onclick text, link id, domain) for a concept, shared by its sidebar entry and highlight span"""
+    return html.escape(text), _onclick_string(text), _concept_link_id(text, label), CONCEPT_LABEL_DOMAINS.get(label, "other")
 
-            domain = self._get_concept_domain(concept)
-            css_class = self.concept_classes.get(domain, "concept-other")
-            link_id = self._generate_concept_link_id(concept)
-            concept_text = content[expanded_start:expanded_end]
+def _trie_pattern(texts: Tuple[str, ...]) -> str:
+    """
+    Regex matching any of texts, with shared prefixes factored into a trie.
+    Longer continuations are tried before a text ends, so the longest text wins.
+    """
+    trie = {}
+    for text in texts:
+        node = trie
+        for char in text:
+            # Matching ignores case, so "Raft" and "raft" share a branch
+            lower = char.lower()
+            node = node.setdefault(lower if len(lower) == 1 else char, {})
+        node[''] = {}  # A text ends here
 
-            highlighted_span = f'''<span class="{css_class}" data-concept="{html.escape(concept.text)}" data-domain="{domain}" data-confidence="{concept.confidence:.2f}" data-link-id="{link_id}" onclick="selectConcept('{link_id}', '{html.escape(concept.text)}', '{domain}')">{html.escape(concept_text)}</span>'''
+    def node_pattern(node: Dict) -> str:
+        pattern = ''
+        # Runs of single-child nodes need no group
+        while len(node) == 1 and '' not in node:
+            char, node = next(iter(node.items()))
+            pattern += re.escape(char)
+        branches = [re.escape(char) + node_pattern(child) for char, child in node.items() if char]
+        if not branches:
+            return pattern
+        if len(branches) == 1:
+            # Only reached when a text also ends here
+            return pattern + '(?:' + branches[0] + ')?'
+        return pattern + '(?:' + '|'.join(branches) + ')' + ('?' if '' in node else '')
 
-            highlighted_content = (
-                highlighted_content[:expanded_start] +
-                highlighted_span +
-                highlighted_content[expanded_end:]
-            )
+    return node_pattern(trie)
 
-        return highlighted_content
+@lru_cache(maxsize=CONCEPT_PATTERN_CACHE_SIZE)
+def _compile_concepts_pattern(texts: Tuple[str, ...], flags: int = re.IGNORECASE) -> re.Pattern:
+    """
+    Whole-word pattern (case-insensitive by default) matching the longest of the concept texts
+    at each position. The match is captured inside a lookahead, so overlapping ones are found too.
+    """
+    return re.compile(r'(?=\b(' + _trie_pattern(texts) + r')\b)', flags)
 
-    def _highlight_concepts_in_html(self, html_content: str, concepts: List[ExtractedConcept]) -> str:
-        """Highlight concepts with simple regex replacement on HTML
+@lru_cache(maxsize=CONCEPT_PATTERN_CACHE_SIZE)
+def _compile_concepts_fullmatch(texts: Tuple[str, ...]) -> re.Pattern:
+    """Case-insensitive pattern for fullmatch against any of the concept texts"""
+    return re.compile(_trie_pattern(texts), re.IGNORECASE)
 
-        Dead simple: just find concept text and wrap it in a span.
-        Sort by length to avoid partial matches.
-        """
-        # Sort by length (longest first) to avoid partial matches
-        sorted_concepts = sorted(concepts, key=lambda x: len(x.text), reverse=True)
+def _regex_concept_occurrences(html_content: str, texts: Tuple[str, ...]) -> Iterator[Tuple[int, int, int]]:
+    """Every whole-word, case-insensitive occurrence of texts as (start, end, index), overlapping ones included"""
+    pattern = _compile_concepts_pattern(texts)
+    is_concept = _compile_concepts_fullmatch(texts).fullmatch
+    concept_index = {text.lower(): index for index, text in enumerate(texts)}
+    
+    def index_of(matched: str) -> int:
+        index = concept_index.get(matched.lower())
+        if index is None:
+            # Case folding can match text whose lowercase differs (e.g. the Kelvin sign)
+            index = next(i for i, text in enumerate(texts)
+                         if re.fullmatch(re.escape(text), matched, re.IGNORECASE))
+        return index
+    
+    for match in pattern.finditer(html_content):
+        start = match.start()
+        matched = match.group(1)
+        yield start, start + len(matched), index_of(matched)
+        
+        # The trie follows a single path, so shorter texts starting here are prefixes
+        # of the longest one that end on a word boundary
+        for length in range(len(matched) - 1, 0, -1):
+            if _is_word_char(matched[length - 1]) != _is_word_char(matched[length]):
+                prefix = matched[:length]
+                if is_concept(prefix):
+                    yield start, start + length, index_of(prefix)
 
-        highlighted_texts = set()
-        result = html_content
+def _lowercase_trie_occurrences(lower_html: str, keys: Tuple[str, ...]) -> Iterator[Tuple[int, int, int]]:
+    """
+    Like _regex_concept_occurrences for lowercased HTML and keys, so the regex needs no
+    case folding and prefixes are looked up directly
+    """
+    pattern = _compile_concepts_pattern(keys, 0)
+    key_index = {key: index for index, key in enumerate(keys)}
+    
+    for match in pattern.finditer(lower_html):
+        start = match.start()
+        matched = match.group(1)
+        yield start, start + len(matched), key_index[matched]
+        
+        for length in range(len(matched) - 1, 0, -1):
+            if _is_word_char(matched[length - 1]) != _is_word_char(matched[length]):
+                index = key_index.get(matched[:length])
+                if index is not None:
+                    yield start, start + length, index
 
-        for concept in sorted_concepts:
-            # Skip duplicates
-            if concept.text.lower() in highlighted_texts:
+def _place_longest_first(occurrences: Iterable[Tuple[int, int, int]], count: int) -> List[Tuple[int, int, int]]:
+    """
+    Pick each text's first occurrence that doesn't overlap one already picked, taking the texts
+    in index order (longest first), as the earlier one substitution per concept did.
+    Occurrences of each text must come in start order; the picks are returned in start order.
+    """
+    by_index = [[] for _ in range(count)]
+    for start, end, index in occurrences:
+        by_index[index].append((start, end))
+    
+    # Picked spans never overlap, so sorted starts and their ends are enough to test a new one
+    starts: List[int] = []
+    ends: List[int] = []
+    picked = []
+    for index, spans in enumerate(by_index):
+        for start, end in spans:
+            i = bisect_right(starts, start)
+            if (i and ends[i - 1] > start) or (i < len(starts) and starts[i] < end):
                 continue
+            starts.insert(i, start)
+            ends.insert(i, end)
+            picked.append((start, end, index))
+            break
+    
+    picked.sort()
+    return picked
 
-            domain = self._get_concept_domain(concept)
-            css_class = self.concept_classes.get(domain, "concept-other")
-            link_id = self._generate_concept_link_id(concept)
-
-            # Simple regex: find the concept text (case insensitive, whole word)
-            # Use \b for word boundaries to avoid partial matches
-            pattern = re.compile(r'\b(' + re.escape(concept.text) + r')\b', re.IGNORECASE)
+# Above this many concepts one scan with the trie regex beats a str.find sweep per concept
+FIND_MAX_CONCEPTS = 100
 
-            # Build the replacement span
-            replacement = f'<span class="{css_class}" data-concept="{html.escape(concept.text)}" data-domain="{domain}" data-confidence="{concept.confidence:.2f}" data-link-id="{link_id}" onclick="selectConcept(\'{link_id}\', \'{html.escape(concept.text)}\', \'{domain}\')">' + r'\1' + '</span>'
+ahocorasick = None  # Imported by _get_ahocorasick
 
-            # Replace first occurrence only to avoid duplicates
-            result = pattern.sub(replacement, result, count=1)
-            highlighted_texts.add(concept.text.lower())
+def _get_ahocorasick():
+    """The pyahocorasick module on first use; None if it isn't installed"""
+    global ahocorasick
+    if ahocorasick is None:
+        try:
+            import ahocorasick
+        except ImportError:
+            ahocorasick = False
+    return ahocorasick or None
 
-        return result
+def _is_word_char(char: str) -> bool:
+    r"""Whether re's \w matches char"""
+    return char.isalnum() or char == '_'
 
-    def _get_concept_domain(self, concept: ExtractedConcept) -> str:
-        """Map concept label to domain"""
-        domain_mapping = {
-            "computer_science_concept": "cs", "algorithm": "cs", "data_structure": "cs",
-            "programming_language": "cs", "software_system": "cs", "distributed_system": "cs",
-            "machine_learning_concept": "cs", "mathematics_concept": "math", "mathematical_theorem": "math",
-            "statistical_method": "math", "mathematical_proof": "math", "equation": "math",
-            "social_science_concept": "social", "research_method": "social", "psychological_concept": "social",
-            "economic_concept": "social", "organizational_behavior": "social", "philosophical_concept": "philosophy",
-            "ethical_principle": "philosophy", "logical_argument": "philosophy", "epistemological_concept": "philosophy",
-            "person_mention": "people", "organization": "entities", "academic_paper": "references",
-            "research_finding": "findings", "methodology": "methods", "tool": "tools", "framework": "tools",
-        }
-        return domain_mapping.get(concept.label, "other")
-    
-    def _generate_concept_link_id(self, concept: ExtractedConcept) -> str:
-        """Generate unique link ID for concept"""
-        concept_id = hashlib.sha256(f"{concept.text}_{concept.label}".encode()).hexdigest()[:8]
-        return f"concept-{concept_id}"
-    
-    def _generate_title(self, doc_metadata: DocumentMetadata, file_path: Optional[Path] = None) -> str:
-        """Generate page title"""
-        if doc_metadata.suggested_title:
-            return doc_metadata.suggested_title
-        elif file_path:
-            return file_path.stem.replace('-', ' ').replace('_', ' ').title()
-        else:
-            return f"{doc_metadata.doc_type.value.title()} Document"
-    
-    def _generate_sidebar_data(self, extraction_result: ConceptExtractionResult, semantic_mapping: SemanticMapping) -> Dict:
-        """Generate data for the concepts sidebar"""
-        concepts_by_domain = {}
-        for concept in extraction_result.concepts:
-            domain = self._get_concept_domain(concept)
-            if domain not in concepts_by_domain:
-                concepts_by_domain[domain] = []
-            concepts_by_domain[domain].append(concept)
-        
-        sorted_domains = sorted(concepts_by_domain.items(), key=lambda x: len(x[1]), reverse=True)
-        
-        return {
-            "concepts_by_domain": sorted_domains,
-            "domain_distribution": extraction_result.domain_distribution,
-            "concept_density": extraction_result.concept_density,
-            "total_concepts": len(extraction_result.concepts),
-            "processing_metadata": extraction_result.processing_metadata
-        }
-    
-    def _process_content_by_type(self, content: str, doc_type: DocumentType) -> Tuple[str, List[DocumentOutline]]:
-        """Process content based on document type and extract outline"""
-        return self._format_markdown_content(content)
+def _find_occurrences(lower_html: str, keys: Tuple[str, ...], module) -> Iterator[Tuple[int, int]]:
+    """
+    Every occurrence of keys in lower_html as (start, index), from one Aho-Corasick pass
+    when the pyahocorasick module is given, or else one str.find sweep per key
+    """
+    if module is not None:
+        automaton = module.Automaton()
+        for index, key in enumerate(keys):
+            automaton.add_word(key, index)
+        automaton.make_automaton()
+        for last, index in automaton.iter(lower_html):
+            yield last + 1 - len(keys[index]), index
+        return
     
-    def _format_markdown_content(self, content: str) -> Tuple[str, List[DocumentOutline]]:
-        """Format markdown content using Python's markdown library"""
-        import markdown
-        from markdown.extensions import Extension
-        from markdown.treeprocessors import Treeprocessor
-        import xml.etree.ElementTree as etree
+    for index, key in enumerate(keys):
+        start = lower_html.find(key)
+        while start != -1:
+            yield start, index
+            start = lower_html.find(key, start + 1)
 
-        outline = []
-
-        # Custom extension to add IDs to headers and extract outline
-        class OutlineExtractor(Treeprocessor):
-            def run(self, root):
-                for elem in root.iter():
-                    if elem.tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                        level = int(elem.tag[1])
-                        text = ''.join(elem.itertext())
-                        outline_id = f"heading-{len(outline)}"
-                        elem.set('id', outline_id)
-                        outline.append(DocumentOutline(level, text, outline_id, 0))
-                return root
-
-        class OutlineExtension(Extension):
-            def extendMarkdown(self, md):
-                md.treeprocessors.register(OutlineExtractor(md), 'outline', 15)
-
-        # Use markdown library to convert
-        md = markdown.Markdown(extensions=['extra', OutlineExtension()])
-        html = md.convert(content)
+def _whole_word_occurrences(lower_html: str, keys: Tuple[str, ...], module) -> Iterator[Tuple[int, int, int]]:
+    r"""Occurrences of keys in lower_html as (start, end, index), keeping those with a word boundary (\b) at both ends"""
+    length = len(lower_html)
+    for start, index in _find_occurrences(lower_html, keys, module):
+        end = start + len(keys[index])
+        if (start > 0 and _is_word_char(lower_html[start - 1])) == _is_word_char(lower_html[start]):
+            continue
+        if (end < length and _is_word_char(lower_html[end])) == _is_word_char(lower_html[end - 1]):
+            continue
+        yield start, end, index
 
-        return html, outline
+def _lowercase_concept_matches(html_content: str, texts: Tuple[str, ...]) -> Optional[List[Tuple[int, int, int]]]:
+    """
+    Whole-word, case-insensitive matches of texts as (start, end, index), placed longest
+    first like _place_longest_first over _regex_concept_occurrences, but found in the
+    lowercased HTML without the regex engine's case folding. None if lowercasing would
+    shift offsets (a few characters lowercase to two).
+    """
+    lower_html = html_content.lower()
+    keys = tuple(text.lower() for text in texts)
+    if len(lower_html) != len(html_content) or any(len(key) != len(text) for key, text in zip(keys, texts)):
+        return None
     
-    def _generate_complete_html(
-        self,
-        processed_content: str,
-        title: str,
-        sidebar_data: Dict,
-        doc_metadata: DocumentMetadata,
-        url_path: str,
-        outline: List[DocumentOutline]
-    ) -> str:
-        """Generate the complete HTML page with optimized 3-column layout"""
-        
-        # Generate component HTML
-        concept_css = self._generate_concept_css()
-        left_sidebar_html = self._generate_left_sidebar_html(sidebar_data)
-        outline_html = self._generate_outline_html(outline)
-        
-        return f"""<!DOCTYPE html>
+    if len(keys) == 1:
+        # Only a concept's first occurrence is highlighted, so a lone concept stops at it
+        first = next(_whole_word_occurrences(lower_html, keys, None), None)
+        return [first] if first is not None else []
+    
+    module = _get_ahocorasick()
+    if module is None and len(keys) > FIND_MAX_CONCEPTS:
+        # Too many keys to sweep for one by one
+        occurrences = _lowercase_trie_occurrences(lower_html, keys)
+    else:
+        occurrences = _whole_word_occurrences(lower_html, keys, module)
+    return _place_longest_first(occurrences, len(keys))
+
+# Page skeleton filled by HTMLGenerator._generate_complete_html; %(name)s placeholders
+_PAGE_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{html.escape(title)} - slop.at</title>
+    <title>%(title)s - slop.at</title>
     <meta name="description" content="Semantic document analysis by slop.at">
     
     <style>
-        {concept_css}
+        %(concept_css)s
         
         /* Optimized 3-column layout */
-        body {{
+        body {
             margin: 0;
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: #fafafa;
             color: #1a1a1a;
             line-height: 1.6;
-        }}
+        }
         
-        .container {{
+        .container {
             display: grid;
             grid-template-columns: 300px 1fr 280px;
             gap: 2rem;
@@ -343,50 +302,50 @@ class HTMLGenerator:
             margin: 0 auto;
             padding: 2rem 1rem;
             min-height: 100vh;
-        }}
+        }
         
         /* Header spans all columns */
-        .header {{
+        .header {
             grid-column: 1 / -1;
             text-align: center;
             margin-bottom: 2rem;
             padding-bottom: 1rem;
             border-bottom: 1px solid #e5e7eb;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             margin: 0;
             font-size: 2rem;
             font-weight: 600;
             color: #111827;
-        }}
+        }
         
-        .header .subtitle {{
+        .header .subtitle {
             margin-top: 0.5rem;
             color: #6b7280;
             font-size: 0.9rem;
-        }}
+        }
         
         /* Left Sidebar - Stacked */
-        .left-sidebar {{
+        .left-sidebar {
             display: flex;
             flex-direction: column;
             gap: 1.5rem;
             height: fit-content;
             position: sticky;
             top: 2rem;
-        }}
+        }
         
-        .sidebar-section {{
+        .sidebar-section {
             background: white;
             padding: 1.5rem;
             border-radius: 12px;
             box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
             font-size: 0.85rem;
-        }}
+        }
         
         /* Main Content */
-        .main-content {{
+        .main-content {
             background: white;
             padding: 3rem;
             border-radius: 12px;
@@ -394,10 +353,10 @@ class HTMLGenerator:
             font-size: 1.1rem;
             line-height: 1.8;
             overflow-x: auto;
-        }}
+        }
         
         /* Right Sidebar - Outline */
-        .right-sidebar {{
+        .right-sidebar {
             background: white;
             padding: 1.5rem;
             border-radius: 12px;
@@ -406,63 +365,63 @@ class HTMLGenerator:
             position: sticky;
             top: 2rem;
             font-size: 0.85rem;
-        }}
+        }
         
         /* Sidebar Headers */
-        .sidebar h3 {{
+        .sidebar h3 {
             margin-top: 0;
             margin-bottom: 1rem;
             color: #374151;
             font-size: 1rem;
             border-bottom: 2px solid #f3f4f6;
             padding-bottom: 0.5rem;
-        }}
+        }
         
         /* Domain Groups */
-        .domain-group {{
+        .domain-group {
             margin-bottom: 1.5rem;
-        }}
+        }
         
-        .domain-title {{
+        .domain-title {
             font-weight: 600;
             margin-bottom: 0.5rem;
             padding: 0.25rem 0.5rem;
             border-radius: 4px;
             font-size: 0.8rem;
-        }}
+        }
         
-        .concept-list {{
+        .concept-list {
             list-style: none;
             padding: 0;
             margin: 0;
-        }}
+        }
         
-        .concept-item {{
+        .concept-item {
             margin: 0.25rem 0;
             padding: 0.25rem 0.5rem;
             border-radius: 4px;
             cursor: pointer;
             font-size: 0.75rem;
             transition: background-color 0.2s;
-        }}
+        }
         
-        .concept-item:hover {{
+        .concept-item:hover {
             background-color: #f9fafb;
-        }}
+        }
         
         /* Outline Styles */
-        .outline-list {{
+        .outline-list {
             list-style: none;
             padding: 0;
             margin: 0;
-        }}
+        }
         
-        .outline-item {{
+        .outline-item {
             margin: 0.25rem 0;
             transition: all 0.2s;
-        }}
+        }
         
-        .outline-link {{
+        .outline-link {
             display: block;
             padding: 0.25rem 0.5rem;
             color: #4b5563;
@@ -470,150 +429,530 @@ class HTMLGenerator:
             border-radius: 4px;
             font-size: 0.8rem;
             line-height: 1.3;
-        }}
+        }
         
-        .outline-link:hover {{
+        .outline-link:hover {
             background-color: #f3f4f6;
             color: #1f2937;
-        }}
+        }
         
-        .outline-item.level-1 {{ margin-left: 0; font-weight: 600; }}
-        .outline-item.level-2 {{ margin-left: 1rem; }}
-        .outline-item.level-3 {{ margin-left: 2rem; }}
-        .outline-item.level-4 {{ margin-left: 3rem; }}
+        .outline-item.level-1 { margin-left: 0; font-weight: 600; }
+        .outline-item.level-2 { margin-left: 1rem; }
+        .outline-item.level-3 { margin-left: 2rem; }
+        .outline-item.level-4 { margin-left: 3rem; }
         
         /* Stats */
-        .stats {{
+        .stats {
             margin-top: 1rem;
             padding-top: 1rem;
             border-top: 1px solid #e5e7eb;
             font-size: 0.75rem;
             color: #6b7280;
-        }}
+        }
         
         /* Related Content */
-        .related-content {{
+        .related-content {
             margin-top: 1rem;
             padding-top: 1rem;
             border-top: 1px solid #e5e7eb;
-        }}
+        }
         
         /* Responsive */
-        @media (max-width: 1200px) {{
-            .container {{
+        @media (max-width: 1200px) {
+            .container {
                 grid-template-columns: 280px 1fr 240px;
                 gap: 1.5rem;
-            }}
-        }}
+            }
+        }
         
-        @media (max-width: 1000px) {{
-            .container {{
+        @media (max-width: 1000px) {
+            .container {
                 grid-template-columns: 1fr;
                 gap: 1rem;
                 padding: 1rem 0.5rem;
-            }}
+            }
             
             .left-sidebar,
-            .right-sidebar {{
+            .right-sidebar {
                 position: static;
                 order: 2;
-            }}
+            }
             
-            .main-content {{
+            .main-content {
                 order: 1;
                 padding: 2rem 1.5rem;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
     <div class="container">
         <header class="header">
-            <h1>{html.escape(title)}</h1>
+            <h1>%(title)s</h1>
             <div class="subtitle">
-                {doc_metadata.doc_type.value.title()} · 
-                {len(sidebar_data['concepts_by_domain'])} domains · 
-                {sidebar_data['total_concepts']} concepts
+                %(doc_type)s · 
+                %(domain_count)s domains · 
+                %(total_concepts)s concepts
             </div>
         </header>
         
         <aside class="left-sidebar">
-            {left_sidebar_html}
+            %(left_sidebar_html)s
         </aside>
         
         <main class="main-content">
-            {processed_content}
+            %(processed_content)s
         </main>
         
         <aside class="right-sidebar">
-            {outline_html}
+            %(outline_html)s
         </aside>
     </div>
     
+    %(concepts_script_open)s%(concepts_json)s</script>
+    
     <script>
-        function selectConcept(linkId, conceptText, domain) {{
+        function selectConcept(linkId, conceptText, domain) {
             // Highlight selected concept
-            document.querySelectorAll('.concept-selected').forEach(el => {{
+            document.querySelectorAll('.concept-selected').forEach(el => {
                 el.classList.remove('concept-selected');
-            }});
+            });
             
-            const element = document.querySelector(`[data-link-id="${{linkId}}"]`);
-            if (element) {{
+            const element = document.querySelector(`[data-link-id="${linkId}"]`);
+            if (element) {
                 element.classList.add('concept-selected');
-            }}
+            }
             
             // Update related content
             updateRelatedContent(conceptText, domain);
-        }}
+        }
         
-        function updateRelatedContent(conceptText, domain) {{
+        function updateRelatedContent(conceptText, domain) {
             const relatedDiv = document.getElementById('related-content');
-            if (relatedDiv) {{
+            if (relatedDiv) {
                 relatedDiv.innerHTML = `
                     <div style="margin-bottom: 0.5rem; font-weight: 600; font-size: 0.8rem;">
-                        ${{conceptText}}
+                        ${conceptText}
                     </div>
                     <div style="color: #6b7280; font-size: 0.75rem; margin-bottom: 0.5rem;">
-                        ${{domain}} concept
+                        ${domain} concept
                     </div>
                     <div style="color: #6b7280; font-style: italic; font-size: 0.7rem;">
                         Related content will appear here when cross-document linking is implemented
                     </div>
                 `;
-            }}
-        }}
+            }
+        }
         
         // Smooth scrolling for outline links
-        document.addEventListener('click', (e) => {{
-            if (e.target.classList.contains('outline-link')) {{
+        document.addEventListener('click', (e) => {
+            if (e.target.classList.contains('outline-link')) {
                 e.preventDefault();
                 const targetId = e.target.getAttribute('href').substring(1);
                 const targetElement = document.getElementById(targetId);
-                if (targetElement) {{
-                    targetElement.scrollIntoView({{ behavior: 'smooth', block: 'start' }});
-                }}
-            }}
-        }});
+                if (targetElement) {
+                    targetElement.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                }
+            }
+        });
         
         // Keyboard navigation
-        document.addEventListener('keydown', (e) => {{
-            if (e.key === 'Escape') {{
-                document.querySelectorAll('.concept-selected').forEach(el => {{
+        document.addEventListener('keydown', (e) => {
+            if (e.key === 'Escape') {
+                document.querySelectorAll('.concept-selected').forEach(el => {
                     el.classList.remove('concept-selected');
-                }});
+                });
                 const relatedDiv = document.getElementById('related-content');
-                if (relatedDiv) {{
+                if (relatedDiv) {
                     relatedDiv.innerHTML = `
                         <p style="color: #6b7280; font-style: italic; font-size: 0.7rem;">
                             Click a concept to discover related content
                         </p>
                     `;
-                }}
-            }}
-        }});
+                }
+            }
+        });
     </script>
 </body>
 </html>"""
+
+@dataclass(slots=True)
+class DocumentOutline:
+    """Document outline item"""
+    level: int
+    text: str
+    id: str
+    line_number: int
+
+@dataclass(slots=True)
+class SlopPage:
+    """A generated slop.at page"""
+    html_content: str
+    url_path: str
+    title: str
+    concepts: List[ExtractedConcept]
+    metadata: DocumentMetadata
+
+# Sidebar and outline fragments, filled once per item; each starts with its separating newline
+_DOMAIN_GROUP_OPEN = """
+
+            <div class="domain-group">
+                <div class="domain-title %s">
+                    %s (%d)
+                </div>
+                <ul class="concept-list">"""
+
+_CONCEPT_SPAN_OPEN = (
+    '<span class="%s" data-concept="%s" data-domain="%s" data-confidence="%.2f" data-link-id="%s" '
+    'onclick="selectConcept(\'%s\', \'%s\', \'%s\')">'
+)
+
+_CONCEPT_ITEM = """
+
+                    <li class="concept-item %s" 
+                        onclick="selectConcept('%s', '%s', '%s')"
+                        title="Confidence: %.2f">
+                        %s
+                    </li>"""
+
+_OUTLINE_ITEM = """
+
+                <li class="outline-item level-%d">
+                    <a href="#%s" class="outline-link">
+                        %s
+                    </a>
+                </li>"""
+
+# Header tag -> outline level; looked up once per element in the parsed tree
+HEADER_LEVELS = {f'h{level}': level for level in range(1, 7)}
+
+class OutlineExtractor(Treeprocessor):
+    """Give headers ids and collect them into the outline list"""
+    
+    def __init__(self, md, outline: List[DocumentOutline]):
+        super().__init__(md)
+        self.outline = outline
+    
+    def run(self, root):
+        outline = self.outline
+        for elem in root.iter():
+            level = HEADER_LEVELS.get(elem.tag)
+            if level is not None:
+                text = ''.join(elem.itertext())
+                outline_id = f"heading-{len(outline)}"
+                elem.set('id', outline_id)
+                outline.append(DocumentOutline(level, text, outline_id, 0))
+        return root
+
+class OutlineExtension(Extension):
+    """Custom extension to add IDs to headers and extract outline"""
+    
+    def __init__(self, outline: List[DocumentOutline]):
+        super().__init__()
+        self.outline = outline
+    
+    def extendMarkdown(self, md):
+        md.treeprocessors.register(OutlineExtractor(md, self.outline), 'outline', 15)
+
+# Building a Markdown converter registers every extension and compiles their patterns,
+# so each thread keeps one and resets it between documents (converters aren't thread-safe)
+_markdown_local = threading.local()
+
+def _markdown_converter() -> Tuple[markdown.Markdown, List[DocumentOutline]]:
+    """This thread's Markdown converter, with the outline list its extension fills"""
+    converter = getattr(_markdown_local, 'converter', None)
+    if converter is None:
+        outline = []
+        converter = markdown.Markdown(extensions=['extra', OutlineExtension(outline)])
+        _markdown_local.converter = converter
+        _markdown_local.outline = outline
+    return converter, _markdown_local.outline
+
+class HTMLGenerator:
+    """
+    Generate beautiful HTML pages with 3-column layout:
+    stacked left sidebars | content | outline
+    """
+    
+    def __init__(self, base_url: str = "https://slop.at"):
+        self.base_url = base_url
+        
+        # Domain color mappings for concept highlighting
+        self.domain_colors = {
+            "cs": "#3B82F6",           # Blue for Computer Science
+            "math": "#8B5CF6",         # Purple for Mathematics  
+            "social": "#10B981",       # Green for Social Science
+            "philosophy": "#F59E0B",   # Amber for Philosophy
+            "people": "#EF4444",       # Red for People
+            "entities": "#6B7280",     # Gray for Organizations
+            "references": "#EC4899",   # Pink for Papers/References
+            "findings": "#84CC16",     # Lime for Research Findings
+            "methods": "#06B6D4",      # Cyan for Methodologies
+            "tools": "#8B5A2B",       # Brown for Tools/Frameworks
+            "other": "#6B7280"         # Gray for Other
+        }
+        
+        # CSS classes for concept types
+        self.concept_classes = {
+            "cs": "concept-cs",
+            "math": "concept-math", 
+            "social": "concept-social",
+            "philosophy": "concept-philosophy",
+            "people": "concept-people",
+            "entities": "concept-entities",
+            "references": "concept-references",
+            "findings": "concept-findings",
+            "methods": "concept-methods",
+            "tools": "concept-tools",
+            "other": "concept-other"
+        }
+        
+        # Concept CSS depends only on the colors above, so every page shares one copy
+        self._concept_css = self._generate_concept_css()
+    
+    def generate_slop_page(
+        self,
+        content: str,
+        extraction_result: ConceptExtractionResult,
+        doc_metadata: DocumentMetadata,
+        semantic_mapping: SemanticMapping,
+        file_path: Optional[Path] = None,
+        content_digest: Optional[bytes] = None
+    ) -> SlopPage:
+        """
+        Generate a complete slop.at page with optimized 3-column layout.
+        content_digest is the SHA-256 of the UTF-8 content, if the caller already has it.
+        """
+
+        # Generate unique URL path
+        url_path = self._generate_url_path(content, file_path, content_digest)
+
+        # Generate page title
+        title = self._generate_title(doc_metadata, file_path)
+
+        # Create sidebar data
+        sidebar_data = self._generate_sidebar_data(extraction_result, semantic_mapping)
+
+        # SIMPLIFIED FLOW:
+        # 1. Convert markdown to HTML first
+        processed_content, outline = self._process_content_by_type(content, doc_metadata.doc_type)
+
+        # 2. Highlight concepts in the HTML (text-based search, not positions)
+        highlighted_content = self._highlight_concepts_in_html(processed_content, extraction_result.concepts)
+
+        # Generate complete HTML page
+        html_content = self._generate_complete_html(
+            highlighted_content,
+            title,
+            sidebar_data,
+            doc_metadata,
+            url_path,
+            outline
+        )
+
+        return SlopPage(
+            html_content=html_content,
+            url_path=url_path,
+            title=title,
+            concepts=extraction_result.concepts,
+            metadata=doc_metadata
+        )
+    
+    def _generate_url_path(self, content: str, file_path: Optional[Path] = None, content_digest: Optional[bytes] = None) -> str:
+        """Generate a unique URL path for the slop"""
+        if file_path:
+            base_name = file_path.stem
+            clean_name = URL_SLUG_PATTERN.sub('-', base_name)
+            return f"/{clean_name}"
+        else:
+            if content_digest is None:
+                content_digest = hashlib.sha256(content.encode()).digest()
+            content_hash = content_digest[:4].hex()
+            return f"/slop-{content_hash}"
+    
+    def _expand_to_word_boundaries(self, classes: str, start: int, end: int) -> Tuple[int, int]:
+        """Expand concept boundaries to include full words
+
+        GLiNER often detects partial words, so we expand the span to word boundaries.
+        Avoids expanding into markdown syntax characters.
+        Works on the content's character classes (content.translate(_WORD_CHAR_CLASSES)),
+        computed once per document: 'w' for letters, digits and '-', which words may span.
+        """
+        # Expand left to word boundary (but not past spaces, markdown syntax or newlines)
+        while start > 0 and classes[start - 1] == 'w':
+            start -= 1
+
+        # Expand right to word boundary (but not past spaces, markdown syntax or newlines)
+        length = len(classes)
+        while end < length and classes[end] == 'w':
+            end += 1
+
+        return start, end
+
+    def _highlight_concepts(self, content: str, concepts: List[ExtractedConcept]) -> str:
+        """Apply concept highlighting to text content
+
+        Expands concept boundaries to word boundaries to avoid partial word highlighting.
+        Concepts overlapping an earlier one are skipped.
+        """
+        sorted_concepts = sorted(concepts, key=attrgetter('start'))
+        classes = content.translate(_WORD_CHAR_CLASSES)
+        parts = []
+        cursor = 0
+
+        for concept in sorted_concepts:
+            # Expand to word boundaries
+            expanded_start, expanded_end = self._expand_to_word_boundaries(
+                classes, concept.start, concept.end
+            )
+            if expanded_start < cursor:
+                continue
+
+            concept_text = content[expanded_start:expanded_end]
+            open_tag = self._concept_span_open_tag(concept)
+
+            parts += (content[cursor:expanded_start], open_tag, html.escape(concept_text), '</span>')
+            cursor = expanded_end
+
+        parts.append(content[cursor:])
+        return ''.join(parts)
+
+    def _highlight_concepts_in_html(self, html_content: str, concepts: List[ExtractedConcept]) -> str:
+        """Highlight concepts with simple regex replacement on HTML
+
+        Dead simple: just find concept text and wrap it in a span.
+        Sort by length to avoid partial matches.
+        All concepts share one alternation, so the HTML is scanned once.
+        """
+        # Skip duplicates up front; the first concept for a text wins
+        concepts_by_text = {}
+        for concept in concepts:
+            key = concept.text.lower()
+            if key and key not in concepts_by_text:
+                concepts_by_text[key] = concept
+
+        if not concepts_by_text:
+            return html_content
+
+        # Sort by length (longest first) to avoid partial matches
+        unique_concepts = sorted(concepts_by_text.values(), key=lambda x: len(x.text), reverse=True)
+
+        # Find the concept text (case insensitive, whole word) in the lowercased HTML,
+        # or else with a regex using \b for word boundaries to avoid partial matches
+        texts = tuple(concept.text for concept in unique_concepts)
+        matches = _lowercase_concept_matches(html_content, texts)
+        if matches is None:
+            matches = _place_longest_first(_regex_concept_occurrences(html_content, texts), len(texts))
+        highlighted = [False] * len(unique_concepts)
+        remaining = len(unique_concepts)
+
+        parts = []
+        cursor = 0
+        for start, end, index in matches:
+            # Replace first occurrence only to avoid duplicates
+            if highlighted[index]:
+                continue
+            highlighted[index] = True
+            # Spans are built only for concepts that occur, once each
+            open_tag = self._concept_span_open_tag(unique_concepts[index])
+            parts += (html_content[cursor:start], open_tag, html_content[start:end], '</span>')
+            cursor = end
+
+            # Nothing left to highlight, so the rest of the page can be copied as is
+            remaining -= 1
+            if not remaining:
+                break
+
+        parts.append(html_content[cursor:])
+        return ''.join(parts)
+
+    def _concept_span_open_tag(self, concept: ExtractedConcept) -> str:
+        """Opening tag of the span that highlights a concept in the page"""
+        escaped_text, onclick_text, link_id, domain = self._concept_markup(concept)
+        css_class = self.concept_classes.get(domain, "concept-other")
+        return _CONCEPT_SPAN_OPEN % (css_class, escaped_text, domain, concept.confidence, link_id, link_id, onclick_text, domain)
+
+    def _concept_markup(self, concept: ExtractedConcept) -> Tuple[str, str, str, str]:
+        """Escaped text, onclick text, link ID and domain of a concept, computed once per (text, label)"""
+        return _concept_markup(concept.text, concept.label)
+    
+    def _get_concept_domain(self, concept: ExtractedConcept) -> str:
+        """Map concept label to domain"""
+        return CONCEPT_LABEL_DOMAINS.get(concept.label, "other")
+    
+    def _generate_concept_link_id(self, concept: ExtractedConcept) -> str:
+        """Generate unique link ID for concept"""
+        return _concept_markup(concept.text, concept.label)[2]
+    
+    def _generate_title(self, doc_metadata: DocumentMetadata, file_path: Optional[Path] = None) -> str:
+        """Generate page title"""
+        if doc_metadata.suggested_title:
+            return doc_metadata.suggested_title
+        elif file_path:
+            return file_path.stem.replace('-', ' ').replace('_', ' ').title()
+        else:
+            return f"{doc_metadata.doc_type.value.title()} Document"
+    
+    def _generate_sidebar_data(self, extraction_result: ConceptExtractionResult, semantic_mapping: SemanticMapping) -> Dict:
+        """Generate data for the concepts sidebar"""
+        concepts_by_domain = defaultdict(list)
+        for concept in extraction_result.concepts:
+            concepts_by_domain[CONCEPT_LABEL_DOMAINS.get(concept.label, "other")].append(concept)
+        
+        domain_sizes = [(domain, concepts, len(concepts)) for domain, concepts in concepts_by_domain.items()]
+        domain_sizes.sort(key=itemgetter(2), reverse=True)
+        sorted_domains = [(domain, concepts) for domain, concepts, _ in domain_sizes]
+        
+        return {
+            "concepts_by_domain": sorted_domains,
+            "domain_distribution": extraction_result.domain_distribution,
+            "concept_density": extraction_result.concept_density,
+            "total_concepts": len(extraction_result.concepts),
+            "processing_metadata": extraction_result.processing_metadata
+        }
+    
+    def _process_content_by_type(self, content: str, doc_type: DocumentType) -> Tuple[str, List[DocumentOutline]]:
+        """Process content based on document type and extract outline"""
+        return self._format_markdown_content(content)
+    
+    def _format_markdown_content(self, content: str) -> Tuple[str, List[DocumentOutline]]:
+        """Format markdown content using Python's markdown library"""
+        md, outline = _markdown_converter()
+        outline.clear()
+        
+        # Use markdown library to convert
+        html = md.reset().convert(content)
+        
+        return html, list(outline)
+    
+    def _generate_complete_html(
+        self,
+        processed_content: str,
+        title: str,
+        sidebar_data: Dict,
+        doc_metadata: DocumentMetadata,
+        url_path: str,
+        outline: List[DocumentOutline]
+    ) -> str:
+        """Generate the complete HTML page with optimized 3-column layout"""
+        
+        # Generate component HTML
+        left_sidebar_html = self._generate_left_sidebar_html(sidebar_data)
+        outline_html = self._generate_outline_html(outline)
+        concepts_json = self._generate_concepts_json(processed_content)
+        
+        return _PAGE_TEMPLATE % {
+            'title': html.escape(title),
+            'concept_css': self._concept_css,
+            'doc_type': doc_metadata.doc_type.value.title(),
+            'domain_count': len(sidebar_data['concepts_by_domain']),
+            'total_concepts': sidebar_data['total_concepts'],
+            'left_sidebar_html': left_sidebar_html,
+            'processed_content': processed_content,
+            'outline_html': outline_html,
+            'concepts_script_open': CONCEPTS_SCRIPT_OPEN,
+            'concepts_json': concepts_json
+        }
     
     def _generate_concept_css(self) -> str:
         """Generate CSS for concept highlighting"""
@@ -647,6 +986,23 @@ class HTMLGenerator:
         }}""")
         return "\n".join(css_rules)
     
+    def _generate_concepts_json(self, processed_content: str) -> str:
+        """
+        List the highlighted concepts as JSON for the web API, in page order.
+        Saves the API from scanning every span each time the page is served.
+        """
+        concepts = [
+            {
+                'text': text,
+                'domain': domain,
+                'confidence': float(confidence),
+                'linkId': link_id
+            }
+            for css_class, text, domain, confidence, link_id in CONCEPT_SPAN_PATTERN.findall(processed_content)
+        ]
+        # Keep a literal "</" from closing the script element early
+        return json.dumps(concepts).replace('</', '<\\/')
+    
     def _generate_left_sidebar_html(self, sidebar_data: Dict) -> str:
         """Generate the stacked left sidebar HTML"""
         concepts_html = self._generate_concepts_section_html(sidebar_data)
@@ -666,34 +1022,26 @@ class HTMLGenerator:
     
     def _generate_concepts_section_html(self, sidebar_data: Dict) -> str:
         """Generate the concepts section HTML"""
-        html_parts = ["<h3>📝 Concepts</h3>"]
+        buf = io.StringIO()
+        buf.write("<h3>📝 Concepts</h3>")
         
         for domain, concepts in sidebar_data["concepts_by_domain"]:
             domain_title = domain.replace('_', ' ').title()
             css_class = self.concept_classes.get(domain, "concept-other")
             
-            html_parts.append(f"""
-            <div class="domain-group">
-                <div class="domain-title {css_class}">
-                    {domain_title} ({len(concepts)})
-                </div>
-                <ul class="concept-list">""")
+            buf.write(_DOMAIN_GROUP_OPEN % (css_class, domain_title, len(concepts)))
             
-            sorted_concepts = sorted(concepts, key=lambda x: x.confidence, reverse=True)
+            top_concepts = heapq.nlargest(6, concepts, key=attrgetter('confidence'))
             
-            for concept in sorted_concepts[:6]:  # Show top 6 per domain
-                link_id = self._generate_concept_link_id(concept)
-                html_parts.append(f"""
-                    <li class="concept-item {css_class}" 
-                        onclick="selectConcept('{link_id}', '{html.escape(concept.text)}', '{domain}')"
-                        title="Confidence: {concept.confidence:.2f}">
-                        {html.escape(concept.text)}
-                    </li>""")
+            for concept in top_concepts:  # Show top 6 per domain
+                escaped_text, onclick_text, link_id, _ = self._concept_markup(concept)
+                buf.write(_CONCEPT_ITEM % (css_class, link_id, onclick_text, domain, concept.confidence, escaped_text))
             
-            html_parts.append("</ul></div>")
+            buf.write("\n</ul></div>")
         
         # Add statistics
-        html_parts.append(f"""
+        buf.write(f"""
+
         <div class="stats">
             <div><strong>Stats</strong></div>
             <div>Concepts: {sidebar_data['total_concepts']}</div>
@@ -701,7 +1049,7 @@ class HTMLGenerator:
             <div>Density: {sidebar_data['concept_density']:.3f}</div>
         </div>""")
         
-        return "\n".join(html_parts)
+        return buf.getvalue()
     
     def _generate_outline_html(self, outline: List[DocumentOutline]) -> str:
         """Generate the document outline HTML"""
@@ -713,18 +1061,14 @@ class HTMLGenerator:
             </p>
             """
         
-        html_parts = ["<h3>📋 Outline</h3>", "<ul class=\"outline-list\">"]
+        buf = io.StringIO()
+        buf.write("<h3>📋 Outline</h3>\n<ul class=\"outline-list\">")
         
         for item in outline:
-            html_parts.append(f"""
-                <li class="outline-item level-{item.level}">
-                    <a href="#{item.id}" class="outline-link">
-                        {html.escape(item.text)}
-                    </a>
-                </li>""")
+            buf.write(_OUTLINE_ITEM % (item.level, item.id, html.escape(item.text)))
         
-        html_parts.append("</ul>")
-        return "\n".join(html_parts)
+        buf.write("\n</ul>")
+        return buf.getvalue()
 
 def save_slop_page(slop_page: SlopPage, output_dir: Path) -> Path:
     """Save a slop page to disk"""
@@ -734,7 +1078,7 @@ def save_slop_page(slop_page: SlopPage, output_dir: Path) -> Path:
         filename = 'index.html'
     
     file_path = output_dir / filename
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(slop_page.html_content)
+    # Encoded once and written in one call, without a text-mode wrapper
+    file_path.write_bytes(slop_page.html_content.encode('utf-8'))
     
     return file_path
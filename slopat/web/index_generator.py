@@ -1,213 +1,213 @@
 """Generate an index page for slop.at documents"""
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import codecs
 import html
+import json
+import os
+import re
 
-def generate_index_page(output_dir: Path) -> str:
-    """Generate an index.html page listing all slop documents"""
-    
-    html_files = list(output_dir.glob("*.html"))
-    html_files = [f for f in html_files if f.name != "index.html"]  # Exclude self
-    
-    # Sort by modification time (newest first)
-    html_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-    
-    # Read basic info from each file
-    slops = []
-    for html_file in html_files:
-        try:
-            content = html_file.read_text(encoding='utf-8')
-            
-            # Extract title from HTML
-            title_start = content.find('<title>')
-            title_end = content.find('</title>')
-            if title_start != -1 and title_end != -1:
-                title = content[title_start + 7:title_end].replace(' - slop.at', '')
-            else:
-                title = html_file.stem.replace('-', ' ').replace('_', ' ').title()
-            
-            # Extract concept count from subtitle
-            concept_count = "Unknown"
-            subtitle_start = content.find('<div class="subtitle">')
-            if subtitle_start != -1:
-                subtitle_end = content.find('</div>', subtitle_start)
-                subtitle = content[subtitle_start:subtitle_end]
-                if 'concepts' in subtitle:
-                    # Extract number before "concepts"
-                    import re
-                    match = re.search(r'(\d+)\s+concepts', subtitle)
-                    if match:
-                        concept_count = match.group(1)
-            
-            slops.append({
-                'filename': html_file.name,
-                'title': title,
-                'concept_count': concept_count,
-                'size': f"{html_file.stat().st_size // 1024}KB"
-            })
-        except Exception:
-            # Fallback for files we can't parse
-            slops.append({
-                'filename': html_file.name,
-                'title': html_file.stem.replace('-', ' ').replace('_', ' ').title(),
-                'concept_count': "Unknown",
-                'size': f"{html_file.stat().st_size // 1024}KB"
-            })
-    
-    # Generate HTML
-    index_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>slop.at - Semantic Document Explorer</title>
-    <style>
-        body {{
+# Generated pages close their header subtitle (with the concept count) well inside this many bytes
+INDEX_HEAD_BYTES = 32768
+
+# Threads reading pages for the index; enough to keep a cold disk or network mount busy
+INDEX_READ_WORKERS = 8
+
+# Fewest pages worth handing to a thread; smaller directories are read without a pool
+INDEX_READ_MIN_RUN = 64
+
+# Sidecar in the output directory remembering each page's card, already escaped, by
+# (mtime_ns, size), so pages that haven't changed since the last index aren't read again
+INDEX_CACHE_NAME = ".index_cache.json"
+
+# Cards per index page; older slops continue on index.2.html, index.3.html, ...
+INDEX_PAGE_SIZE = 100
+
+# The index's own pages, which aren't listed as slops; group 1 is the page number
+INDEX_PAGE_PATTERN = re.compile(r'index(?:\.(\d+))?\.html')
+
+# Concept count in a page's header subtitle, e.g. "12 concepts"
+CONCEPT_COUNT_PATTERN = re.compile(r'(\d+)\s+concepts')
+
+# Index page styles, inlined so index.html stays a single self-contained file like the slop pages
+_INDEX_CSS = """
+        body {
             margin: 0;
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             color: white;
-        }}
+        }
         
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             padding: 2rem;
-        }}
+        }
         
-        .header {{
+        .header {
             text-align: center;
             margin-bottom: 3rem;
-        }}
+        }
         
-        .header h1 {{
+        .header h1 {
             font-size: 3rem;
             margin: 0;
             font-weight: 700;
             text-shadow: 0 2px 4px rgba(0,0,0,0.3);
-        }}
+        }
         
-        .header p {{
+        .header p {
             font-size: 1.2rem;
             margin-top: 1rem;
             opacity: 0.9;
-        }}
+        }
         
-        .stats {{
+        .stats {
             display: flex;
             justify-content: center;
             gap: 2rem;
             margin-bottom: 3rem;
             flex-wrap: wrap;
-        }}
+        }
         
-        .stat {{
+        .stat {
             background: rgba(255,255,255,0.1);
             padding: 1rem 2rem;
             border-radius: 12px;
             backdrop-filter: blur(10px);
             text-align: center;
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 2rem;
             font-weight: bold;
             display: block;
-        }}
+        }
         
-        .stat-label {{
+        .stat-label {
             font-size: 0.9rem;
             opacity: 0.8;
             margin-top: 0.5rem;
-        }}
+        }
         
-        .slops-grid {{
+        .slops-grid {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
             gap: 1.5rem;
-        }}
+        }
         
-        .slop-card {{
+        .slop-card {
             background: rgba(255,255,255,0.1);
             backdrop-filter: blur(10px);
             border-radius: 16px;
             padding: 1.5rem;
             transition: all 0.3s ease;
             border: 1px solid rgba(255,255,255,0.2);
-        }}
+        }
         
-        .slop-card:hover {{
+        .slop-card:hover {
             transform: translateY(-5px);
             background: rgba(255,255,255,0.15);
             box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }}
+        }
         
-        .slop-title {{
+        .slop-title {
             font-size: 1.2rem;
             font-weight: 600;
             margin-bottom: 0.5rem;
             color: white;
             text-decoration: none;
             display: block;
-        }}
+        }
         
-        .slop-title:hover {{
+        .slop-title:hover {
             color: #ffd700;
-        }}
+        }
         
-        .slop-meta {{
+        .slop-meta {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-top: 1rem;
             font-size: 0.9rem;
             opacity: 0.8;
-        }}
+        }
         
-        .concept-badge {{
+        .concept-badge {
             background: rgba(255,215,0,0.2);
             color: #ffd700;
             padding: 0.25rem 0.75rem;
             border-radius: 20px;
             font-size: 0.8rem;
             font-weight: 500;
-        }}
+        }
         
-        .empty-state {{
+        .empty-state {
             text-align: center;
             padding: 4rem 2rem;
             opacity: 0.7;
-        }}
+        }
         
-        .empty-state h2 {{
+        .empty-state h2 {
             font-size: 1.5rem;
             margin-bottom: 1rem;
-        }}
+        }
         
-        .command {{
+        .command {
             background: rgba(0,0,0,0.3);
             padding: 0.5rem 1rem;
             border-radius: 8px;
             font-family: 'Monaco', 'Courier New', monospace;
             margin: 1rem 0;
             display: inline-block;
-        }}
+        }
+        
+        .pager {
+            display: flex;
+            justify-content: center;
+            flex-wrap: wrap;
+            gap: 0.5rem;
+            margin-top: 2rem;
+        }
+        
+        .pager a, .pager span {
+            padding: 0.25rem 0.75rem;
+            border-radius: 8px;
+            color: white;
+            text-decoration: none;
+            background: rgba(255,255,255,0.1);
+        }
+        
+        .pager span {
+            background: rgba(255,215,0,0.2);
+            color: #ffd700;
+        }
         
-        @media (max-width: 768px) {{
-            .header h1 {{
+        @media (max-width: 768px) {
+            .header h1 {
                 font-size: 2rem;
-            }}
+            }
             
-            .stats {{
+            .stats {
                 gap: 1rem;
-            }}
+            }
             
-            .slops-grid {{
+            .slops-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
+            }
+        }"""
+
+# Page chrome up to the stats, filled by generate_index_page; %(name)s placeholders
+_INDEX_HEADER = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>slop.at - Semantic Document Explorer</title>
+    <style>%(css)s
     </style>
 </head>
 <body>
@@ -219,61 +219,290 @@ def generate_index_page(output_dir: Path) -> str:
         
         <div class="stats">
             <div class="stat">
-                <span class="stat-number">{len(slops)}</span>
+                <span class="stat-number">%(document_count)d</span>
                 <div class="stat-label">Documents</div>
             </div>
             <div class="stat">
-                <span class="stat-number">{sum(int(s['concept_count']) for s in slops if s['concept_count'].isdigit())}</span>
+                <span class="stat-number">%(total_concepts)d</span>
                 <div class="stat-label">Total Concepts</div>
             </div>
             <div class="stat">
-                <span class="stat-number">{sum(int(s['size'].replace('KB', '')) for s in slops)}</span>
+                <span class="stat-number">%(total_kb)d</span>
                 <div class="stat-label">KB Generated</div>
             </div>
         </div>
 """
-    
-    if slops:
-        index_html += """
+
+_INDEX_GRID_OPEN = """
         <div class="slops-grid">
 """
-        for slop in slops:
-            index_html += f"""
+
+# One card per slop: escaped file name, escaped title, concept count, size
+_INDEX_CARD = """
             <div class="slop-card">
-                <a href="{html.escape(slop['filename'])}" class="slop-title">
-                    {html.escape(slop['title'])}
+                <a href="%s" class="slop-title">
+                    %s
                 </a>
                 <div class="slop-meta">
-                    <span class="concept-badge">{slop['concept_count']} concepts</span>
-                    <span>{slop['size']}</span>
+                    <span class="concept-badge">%s concepts</span>
+                    <span>%s</span>
                 </div>
             </div>
 """
-        index_html += """
+
+_INDEX_GRID_CLOSE = """
         </div>
 """
-    else:
-        index_html += """
+
+_INDEX_EMPTY = """
         <div class="empty-state">
             <h2>No slops yet!</h2>
             <p>Process some documents to get started:</p>
             <div class="command">uv run slopat process data/</div>
         </div>
 """
-    
-    index_html += """
+
+# Links between index pages: one %s per page
+_INDEX_PAGER = """
+        <nav class="pager">%s
+        </nav>
+"""
+
+_INDEX_FOOTER = """
     </div>
 </body>
 </html>"""
+
+def _read_head(html_file: Path) -> str:
+    """
+    Read the part of a slop page the index needs: the head, unless the title
+    or subtitle runs past it, in which case the whole file
+    """
+    with open(html_file, 'rb') as f:
+        data = f.read(INDEX_HEAD_BYTES)
+        if len(data) < INDEX_HEAD_BYTES:
+            content = data.decode('utf-8')
+        else:
+            # A character cut off at the end of the head is left undecoded rather than rejected
+            content = codecs.getincrementaldecoder('utf-8')().decode(data)
+            subtitle_start = content.find('<div class="subtitle">')
+            if '</title>' not in content or subtitle_start == -1 or content.find('</div>', subtitle_start) == -1:
+                content = (data + f.read()).decode('utf-8')
+    
+    # Match text-mode reads, which translate \r\n and \r line endings
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+def _read_slop_card(stat_result: os.stat_result, html_file: Path) -> Optional[dict]:
+    """Title, concept count and size of one slop page for its index card; None if it can't be read"""
+    try:
+        content = _read_head(html_file)
+        
+        # Extract title from HTML
+        title_start = content.find('<title>')
+        title_end = content.find('</title>')
+        if title_start != -1 and title_end != -1:
+            title = content[title_start + 7:title_end].replace(' - slop.at', '')
+        else:
+            title = html_file.stem.replace('-', ' ').replace('_', ' ').title()
+        
+        # Extract concept count from subtitle
+        concept_count = "Unknown"
+        subtitle_start = content.find('<div class="subtitle">')
+        if subtitle_start != -1:
+            subtitle_end = content.find('</div>', subtitle_start)
+            subtitle = content[subtitle_start:subtitle_end]
+            if 'concepts' in subtitle:
+                # Extract number before "concepts"
+                match = CONCEPT_COUNT_PATTERN.search(subtitle)
+                if match:
+                    concept_count = match.group(1)
+        
+        return {
+            'filename_html': html.escape(html_file.name),
+            'title_html': html.escape(title),
+            'concept_count': concept_count,
+            'size': f"{stat_result.st_size // 1024}KB"
+        }
+    except Exception:
+        return None
+
+def _fallback_card(stat_result: os.stat_result, html_file: Path) -> dict:
+    """Card for a page that can't be read or parsed, titled after its file name"""
+    return {
+        'filename_html': html.escape(html_file.name),
+        'title_html': html.escape(html_file.stem.replace('-', ' ').replace('_', ' ').title()),
+        'concept_count': "Unknown",
+        'size': f"{stat_result.st_size // 1024}KB"
+    }
+
+def _read_slop_cards(html_files: List[Tuple[os.stat_result, Path]]) -> List[Optional[dict]]:
+    """Index cards for a run of (stat, path) pairs, in order"""
+    return [_read_slop_card(stat_result, html_file) for stat_result, html_file in html_files]
+
+def _load_index_cache(output_dir: Path) -> Dict[str, list]:
+    """
+    Cached cards by file name, as [mtime_ns, size, escaped file name, escaped title, concept count];
+    empty if there's no usable cache
+    """
+    try:
+        with open(output_dir / INDEX_CACHE_NAME, 'rb') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _save_index_cache(output_dir: Path, cache: Dict[str, list]):
+    """Replace the sidecar cache atomically; a read-only output directory just goes uncached"""
+    cache_path = output_dir / INDEX_CACHE_NAME
+    tmp_path = cache_path.with_name(INDEX_CACHE_NAME + ".tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+def _index_page_name(number: int) -> str:
+    """File name of an index page, numbered from 1"""
+    return "index.html" if number == 1 else f"index.{number}.html"
+
+def _render_index_pages(output_dir: Path) -> List[str]:
+    """
+    Render the index of all slop documents, newest first, as pages of at most
+    INDEX_PAGE_SIZE cards; the header stats cover every slop on every page
+    """
+    
+    # One scan for names and stats; each file's stat is reused for sorting and its size
+    html_files = []
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith('.html') and not INDEX_PAGE_PATTERN.fullmatch(name) and entry.is_file():  # Exclude self
+                html_files.append((entry.stat(), Path(entry.path)))
+    
+    # Sort by modification time (newest first)
+    html_files.sort(key=lambda item: item[0].st_mtime_ns, reverse=True)
+    
+    # Reuse the cards of pages that haven't changed since the last index
+    cache = _load_index_cache(output_dir)
+    new_cache = {}
+    slops = []
+    stale = []
+    for stat_result, html_file in html_files:
+        name = html_file.name
+        key = [stat_result.st_mtime_ns, stat_result.st_size]
+        cached = cache.get(name)
+        if isinstance(cached, list) and len(cached) == 5 and cached[:2] == key:
+            new_cache[name] = cached
+            slops.append({
+                'filename_html': cached[2],
+                'title_html': cached[3],
+                'concept_count': cached[4],
+                'size': f"{stat_result.st_size // 1024}KB"
+            })
+        else:
+            stale.append((len(slops), stat_result, html_file))
+            slops.append(None)
+    
+    # Read basic info from the other files. Large batches are split into contiguous runs read by
+    # separate threads, so reads overlap on slow storage without a task per file.
+    stale_files = [(stat_result, html_file) for _, stat_result, html_file in stale]
+    run = max(INDEX_READ_MIN_RUN, -(-len(stale_files) // INDEX_READ_WORKERS))
+    if len(stale_files) <= run:
+        cards = _read_slop_cards(stale_files)
+    else:
+        runs = [stale_files[i:i + run] for i in range(0, len(stale_files), run)]
+        with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+            cards = [card for run_cards in executor.map(_read_slop_cards, runs) for card in run_cards]
+    
+    for (position, stat_result, html_file), card in zip(stale, cards):
+        if card is None:
+            # Unreadable files aren't cached, so they're retried next time
+            card = _fallback_card(stat_result, html_file)
+        else:
+            new_cache[html_file.name] = [
+                stat_result.st_mtime_ns, stat_result.st_size,
+                card['filename_html'], card['title_html'], card['concept_count']
+            ]
+        slops[position] = card
+    
+    if new_cache != cache:
+        _save_index_cache(output_dir, new_cache)
+    
+    # Header stats in one pass; sizes come straight from the stats rather than the formatted cards
+    total_concepts = 0
+    total_kb = 0
+    for slop, (stat_result, _) in zip(slops, html_files):
+        concept_count = slop['concept_count']
+        if concept_count.isdigit():
+            total_concepts += int(concept_count)
+        total_kb += stat_result.st_size // 1024
+    
+    header = _INDEX_HEADER % {
+        'css': _INDEX_CSS,
+        'document_count': len(slops),
+        'total_concepts': total_concepts,
+        'total_kb': total_kb,
+    }
+    if not slops:
+        return [header + _INDEX_EMPTY + _INDEX_FOOTER]
+    
+    page_count = -(-len(slops) // INDEX_PAGE_SIZE)
+    pages = []
+    for number in range(1, page_count + 1):
+        # Generate HTML; pieces are joined once at the end rather than copied on every append
+        parts = [header, _INDEX_GRID_OPEN]
+        for slop in slops[(number - 1) * INDEX_PAGE_SIZE:number * INDEX_PAGE_SIZE]:
+            parts.append(_INDEX_CARD % (slop['filename_html'], slop['title_html'], slop['concept_count'], slop['size']))
+        parts.append(_INDEX_GRID_CLOSE)
+        
+        if page_count > 1:
+            links = ''.join(
+                f'\n            <span>{other}</span>' if other == number
+                else f'\n            <a href="{_index_page_name(other)}">{other}</a>'
+                for other in range(1, page_count + 1)
+            )
+            parts.append(_INDEX_PAGER % links)
+        
+        parts.append(_INDEX_FOOTER)
+        pages.append(''.join(parts))
+    
+    return pages
+
+def generate_index_page(output_dir: Path, page: int = 1) -> str:
+    """Generate an index page listing slop documents, newest first; page numbers start at 1"""
+    pages = _render_index_pages(output_dir)
+    if not 1 <= page <= len(pages):
+        raise ValueError(f"Index page {page} out of range 1-{len(pages)}")
+    return pages[page - 1]
+
+def _write_index_page(index_path: Path, index_html: str):
+    """Write one index page, leaving it untouched if it's already up to date"""
+    # Keeping an up-to-date page's mtime keeps HTTP caches valid
+    try:
+        unchanged = index_path.read_text(encoding='utf-8') == index_html
+    except (OSError, ValueError):
+        unchanged = False
     
-    return index_html
+    if not unchanged:
+        # Written beside the page and renamed over it, so a server never sees a half-written page
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        tmp_path.write_bytes(index_html.encode('utf-8'))
+        os.replace(tmp_path, index_path)
 
 def create_index_page(output_dir: Path) -> Path:
-    """Create an index.html file in the output directory"""
-    index_html = generate_index_page(output_dir)
-    index_path = output_dir / "index.html"
+    """Create index.html (and index.2.html, ... for large directories) in the output directory"""
+    pages = _render_index_pages(output_dir)
+    for number, index_html in enumerate(pages, 1):
+        _write_index_page(output_dir / _index_page_name(number), index_html)
     
-    with open(index_path, 'w', encoding='utf-8') as f:
-        f.write(index_html)
+    # Remove pages left over from a longer index
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            match = INDEX_PAGE_PATTERN.fullmatch(entry.name)
+            if match and match.group(1) and int(match.group(1)) > len(pages):
+                os.remove(entry.path)
     
-    return index_path
+    return output_dir / "index.html"
@@ -0,0 +1,88 @@
+"""Test concept highlighting in generated slop pages"""
+
+import random
+
+from slopat.parsers.gliner_extractor import ExtractedConcept
+from slopat.web import html_generator
+from slopat.web.html_generator import (
+    HTMLGenerator,
+    _lowercase_concept_matches,
+    _place_longest_first,
+    _regex_concept_occurrences,
+)
+
+WORDS = ["graph", "database", "graph-database", "node", "edge", "Node", "_id", "x1"]
+
+def _find_path(html_content, texts, monkeypatch):
+    """Matches from one str.find sweep per concept"""
+    monkeypatch.setattr(html_generator, "_get_ahocorasick", lambda: None)
+    return _lowercase_concept_matches(html_content, texts)
+
+def _trie_path(html_content, texts, monkeypatch):
+    """Matches from the lowercase trie regex used for many concepts"""
+    monkeypatch.setattr(html_generator, "_get_ahocorasick", lambda: None)
+    monkeypatch.setattr(html_generator, "FIND_MAX_CONCEPTS", 0)
+    return _lowercase_concept_matches(html_content, texts)
+
+def _regex_path(html_content, texts):
+    """Matches from the case-folding regex fallback"""
+    return _place_longest_first(_regex_concept_occurrences(html_content, texts), len(texts))
+
+def test_longest_concept_placed_first(monkeypatch):
+    """A longer concept claims its text before the shorter concepts inside it"""
+    html_content = "<p>A Graph Database stores a graph; database rows differ.</p>"
+    texts = ("graph database", "database", "graph")
+
+    long_start = html_content.index("Graph Database")
+    graph_start = html_content.index("graph;")
+    database_start = html_content.index("database rows")
+
+    assert _find_path(html_content, texts, monkeypatch) == [
+        (long_start, long_start + 14, 0),
+        (graph_start, graph_start + 5, 2),
+        (database_start, database_start + 8, 1),
+    ]
+
+def test_placements_do_not_overlap(monkeypatch):
+    """A concept whose only occurrences overlap a placed one is left out"""
+    html_content = "<p>distributed systems</p>"
+    texts = ("distributed systems", "systems")
+
+    assert _find_path(html_content, texts, monkeypatch) == [(3, 22, 0)]
+
+def test_whole_words_only(monkeypatch):
+    """Occurrences inside a longer word are not matches"""
+    html_content = "<p>graphs and subgraph, then graph</p>"
+    start = html_content.rindex("graph")
+
+    assert _find_path(html_content, ("graph",), monkeypatch) == [(start, start + 5, 0)]
+
+def test_match_paths_agree(monkeypatch):
+    """The find, trie and regex paths place the same spans on random documents"""
+    rng = random.Random(42)
+    for _ in range(300):
+        html_content = " ".join(rng.choice(WORDS + ["and", "the"]) for _ in range(rng.randint(1, 30)))
+        phrases = {" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) for _ in range(rng.randint(2, 8))}
+        # Longest first with unique lowercase texts, as _highlight_concepts_in_html passes them
+        unique = {phrase.lower(): phrase for phrase in phrases}
+        texts = tuple(sorted(unique.values(), key=len, reverse=True))
+
+        expected = _regex_path(html_content, texts)
+        with monkeypatch.context() as patch:
+            assert _find_path(html_content, texts, patch) == expected
+        with monkeypatch.context() as patch:
+            assert _trie_path(html_content, texts, patch) == expected
+
+def test_highlight_wraps_each_concept_once():
+    """Each concept is wrapped at its first placement, and spans never nest"""
+    concepts = [
+        ExtractedConcept(text, "computer_science_concept", 0, len(text), 0.9, "")
+        for text in ("graph", "graph database")
+    ]
+    html_content = "<p>graph database, graph, graph</p>"
+
+    highlighted = HTMLGenerator()._highlight_concepts_in_html(html_content, concepts)
+
+    assert highlighted.count("<span ") == 2
+    assert highlighted.startswith('<p><span class="concept-cs" data-concept="graph database"')
+    assert highlighted.endswith('">graph</span>, graph</p>')
@@ -0,0 +1,86 @@
+"""Test index page generation"""
+
+import os
+
+import pytest
+
+from slopat.web import index_generator
+from slopat.web.index_generator import create_index_page, generate_index_page
+
+SLOP_PAGE = """<!DOCTYPE html>
+<html>
+<head><title>%s - slop.at</title></head>
+<body>
+<header><div class="subtitle">%d concepts</div></header>
+</body>
+</html>"""
+
+def _write_slops(output_dir, count):
+    """Write count minimal slop pages, each newer than the last"""
+    for number in range(count):
+        path = output_dir / f"slop-{number}.html"
+        path.write_text(SLOP_PAGE % (f"Slop {number}", number), encoding="utf-8")
+        os.utime(path, ns=(number * 10**9, number * 10**9))
+
+def _index_pages(output_dir):
+    """Names of the index pages in output_dir"""
+    return sorted(path.name for path in output_dir.glob("index*.html"))
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    """Two cards per index page"""
+    monkeypatch.setattr(index_generator, "INDEX_PAGE_SIZE", 2)
+
+def test_single_page_has_no_pager(tmp_path, small_pages):
+    """A directory that fits on one page gets only index.html"""
+    _write_slops(tmp_path, 2)
+
+    create_index_page(tmp_path)
+
+    assert _index_pages(tmp_path) == ["index.html"]
+    assert 'class="pager"' not in (tmp_path / "index.html").read_text(encoding="utf-8")
+
+def test_pages_split_newest_first(tmp_path, small_pages):
+    """Cards continue on index.2.html, ... newest first, and every page links the others"""
+    _write_slops(tmp_path, 5)
+
+    create_index_page(tmp_path)
+
+    assert _index_pages(tmp_path) == ["index.2.html", "index.3.html", "index.html"]
+    first = (tmp_path / "index.html").read_text(encoding="utf-8")
+    last = (tmp_path / "index.3.html").read_text(encoding="utf-8")
+    assert "Slop 4" in first and "Slop 3" in first and "Slop 2" not in first
+    assert "Slop 0" in last and "Slop 1" not in last
+    assert 'href="index.2.html"' in first and 'href="index.html"' in last
+    # Header stats cover every slop, not just the page's own cards
+    assert '<span class="stat-number">5</span>' in last
+
+def test_index_pages_are_not_listed(tmp_path, small_pages):
+    """Index pages from an earlier run are never counted as slops"""
+    _write_slops(tmp_path, 2)
+    create_index_page(tmp_path)
+
+    create_index_page(tmp_path)
+
+    assert _index_pages(tmp_path) == ["index.html"]
+    assert '<span class="stat-number">2</span>' in generate_index_page(tmp_path)
+
+def test_stale_pages_removed(tmp_path, small_pages):
+    """Pages past the end of a shrunken index are deleted"""
+    _write_slops(tmp_path, 5)
+    create_index_page(tmp_path)
+    (tmp_path / "index.9.html").write_text("stale", encoding="utf-8")
+
+    for number in range(2, 5):
+        (tmp_path / f"slop-{number}.html").unlink()
+    create_index_page(tmp_path)
+
+    assert _index_pages(tmp_path) == ["index.html"]
+
+def test_generate_page_out_of_range(tmp_path, small_pages):
+    """Asking for a page past the last one is an error"""
+    _write_slops(tmp_path, 3)
+
+    assert "Slop 0" in generate_index_page(tmp_path, page=2)
+    with pytest.raises(ValueError):
+        generate_index_page(tmp_path, page=3)
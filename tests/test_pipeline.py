@@ -0,0 +1,32 @@
+"""Test the slop.at pipeline end to end"""
+
+from pathlib import Path
+
+import pytest
+
+from slopat import SlopProcessor
+from slopat.graph.store import SlopStore
+
+# Small conversation fixture kept next to the tests
+SAMPLE_FILE = Path(__file__).resolve().parent / "sample_conversation.txt"
+
+def test_basic_processing(tmp_path):
+    """Process the sample conversation into a saved slop page and graph document"""
+    pytest.importorskip("gliner")
+    
+    # Store, output and concept cache all live under tmp_path, never in ~/.slopat or a shared output/
+    store = SlopStore(data_dir=tmp_path / "data")
+    processor = SlopProcessor(
+        output_dir=tmp_path / "output", store=store, concept_cache_dir=tmp_path / "cache"
+    )
+    
+    result = processor.process_file(SAMPLE_FILE)
+    
+    assert result.saved_path is not None
+    assert result.saved_path.parent == tmp_path / "output"
+    assert result.saved_path.exists()
+    assert result.slop_page.title
+    assert result.slop_page.url_path
+    assert result.extraction_result.concepts
+    assert result.graph_stored
+    assert store.get_document_stats()["total_documents"] == 1
@@ -0,0 +1,96 @@
+"""Test batched writes to the graph store"""
+
+import pyoxigraph as ox
+import pytest
+
+from slopat.graph.store import SlopStore
+from slopat.parsers.ontology_mapper import RDFTriple, SemanticMapping
+
+NAMESPACES = {"slop": "http://slop.at/ontology#"}
+
+def _mapping(name: str) -> SemanticMapping:
+    """A one-document mapping whose subject is slop:<name>"""
+    triple = RDFTriple(f"slop:{name}", "slop:title", name, "literal")
+    return SemanticMapping([triple], NAMESPACES, concepts_mapped=0, relationships_created=0)
+
+def _stored(store: SlopStore, name: str) -> bool:
+    """Whether the mapping for name made it into the store"""
+    subject = ox.NamedNode(f"http://slop.at/ontology#{name}")
+    return any(True for _ in store.store.quads_for_pattern(subject, None, None))
+
+class _RejectingStore:
+    """Wraps an oxigraph Store, failing any bulk load that mentions a rejected name"""
+
+    def __init__(self, store, rejected: bytes):
+        self._store = store
+        self._rejected = rejected
+
+    def bulk_load(self, data, *args, **kwargs):
+        if self._rejected in data:
+            raise ValueError("rejected")
+        return self._store.bulk_load(data, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._store, name)
+
+def test_batch_loads_on_exit(tmp_path):
+    """Mappings are buffered inside the block and loaded when it exits"""
+    store = SlopStore(data_dir=tmp_path / "data")
+
+    with store.batch() as failed:
+        assert store.in_batch
+        assert store.store_semantic_mapping(_mapping("first"))
+        assert store.store_semantic_mapping(_mapping("second"))
+        assert not _stored(store, "first")
+
+    assert not store.in_batch
+    assert failed == []
+    assert _stored(store, "first") and _stored(store, "second")
+
+def test_batch_reports_each_failed_mapping(tmp_path, monkeypatch):
+    """A failing mapping is reported on its own, and the rest of the batch still loads"""
+    store = SlopStore(data_dir=tmp_path / "data")
+    monkeypatch.setattr(store, "store", _RejectingStore(store.store, b"#bad>"))
+    good, bad, other = _mapping("good"), _mapping("bad"), _mapping("other")
+
+    with store.batch() as failed:
+        for mapping in (good, bad, other):
+            assert store.store_semantic_mapping(mapping)
+
+    assert failed == [bad]
+    assert _stored(store, "good") and _stored(store, "other")
+    assert not _stored(store, "bad")
+
+def test_batch_flushes_every_n(tmp_path):
+    """With flush_every, full buffers are loaded before the block exits"""
+    store = SlopStore(data_dir=tmp_path / "data")
+
+    with store.batch(flush_every=2) as failed:
+        for name in ("a", "b", "c"):
+            store.store_semantic_mapping(_mapping(name))
+        assert _stored(store, "a") and _stored(store, "b")
+        assert not _stored(store, "c")
+
+    assert failed == []
+    assert _stored(store, "c")
+
+def test_batch_discards_buffer_on_error(tmp_path):
+    """An exception inside the block drops the mappings not yet flushed"""
+    store = SlopStore(data_dir=tmp_path / "data")
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.store_semantic_mapping(_mapping("lost"))
+            raise RuntimeError
+
+    assert not store.in_batch
+    assert not _stored(store, "lost")
+
+def test_add_many_mappings_reports_failure(tmp_path, monkeypatch):
+    """add_many_mappings is False when any mapping failed to load"""
+    store = SlopStore(data_dir=tmp_path / "data")
+    monkeypatch.setattr(store, "store", _RejectingStore(store.store, b"#bad>"))
+
+    assert store.add_many_mappings([_mapping("good")])
+    assert not store.add_many_mappings([_mapping("more"), _mapping("bad")])
+    assert _stored(store, "more")
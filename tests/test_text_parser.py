@@ -0,0 +1,46 @@
+"""Test document type detection"""
+
+from slopat.parsers.text_parser import SAMPLE_LINES, DocumentType, TextParser
+
+SPEAKER_LINE = "Alice: what do you think about graph databases"
+PROSE_LINE = "the quick brown fox jumps over the lazy dog"
+HEADER_LINE = "# A markdown header"
+
+def test_short_document_scans_every_line():
+    """Documents up to twice SAMPLE_LINES long are classified from all their lines"""
+    content = "\n".join([SPEAKER_LINE] * (2 * SAMPLE_LINES))
+
+    metadata = TextParser().detect_document_type(content)
+
+    assert metadata.doc_type is DocumentType.CONVERSATION
+    assert metadata.features['scanned_lines'] == 2 * SAMPLE_LINES
+    assert metadata.features['conversation_markers'] == 2 * SAMPLE_LINES
+
+def test_long_document_classified_from_its_ends():
+    """A clear sample from the first and last lines decides without reading the middle"""
+    middle = [HEADER_LINE] * (3 * SAMPLE_LINES)
+    lines = [SPEAKER_LINE] * SAMPLE_LINES + middle + [SPEAKER_LINE] * SAMPLE_LINES
+
+    metadata = TextParser().detect_document_type("\n".join(lines))
+
+    assert metadata.doc_type is DocumentType.CONVERSATION
+    assert metadata.confidence == 1.0
+    assert metadata.features['line_count'] == len(lines)
+    assert metadata.features['scanned_lines'] == 2 * SAMPLE_LINES
+    # Exactly SAMPLE_LINES lines at each end: every speaker line, and none of the headers between
+    assert metadata.features['conversation_markers'] == 2 * SAMPLE_LINES
+    assert metadata.features['markdown_markers'] == 0
+
+def test_ambiguous_sample_scans_the_middle():
+    """When the ends are inconclusive, the whole document is scanned"""
+    middle = [HEADER_LINE] * (3 * SAMPLE_LINES)
+    lines = [PROSE_LINE] * SAMPLE_LINES + middle + [PROSE_LINE] * SAMPLE_LINES
+    content = "\n".join(lines)
+    parser = TextParser()
+
+    metadata = parser.detect_document_type(content)
+
+    assert metadata.doc_type is DocumentType.MARKDOWN
+    assert metadata.features['scanned_lines'] == len(lines)
+    assert metadata.features['markdown_markers'] == len(middle)
+    assert parser._scan_lines(content, 0, len(content))[1] == len(middle)